@@ -0,0 +1,219 @@
+# analytics_backend.py
+# Lecteurs analytiques des tableaux de bord de progression.
+#
+# Les écritures restent sur SQLite (ProgressTracker). Les agrégations des
+# tableaux de bord passent par un lecteur interchangeable:
+#   - "sqlite": agrégats quotidiens de la base de progression (par défaut)
+#   - "duckdb": moteur colonnaire, soit attaché en lecture seule au fichier
+#     SQLite, soit sur un instantané Parquet exporté périodiquement
+#     (python progress_admin.py snapshot), pour ne pas concurrencer les écritures.
+#     Nécessite duckdb, et pyarrow pour l'instantané (requirements-optional.txt).
+#
+# generation() identifie l'état lu par le lecteur: constante pour une lecture
+# directe de la base, changée à chaque rafraîchissement d'un instantané. Les
+# caches des tableaux de bord l'ajoutent à la version des données, sans quoi
+# un agrégat de l'ancien instantané resterait servi jusqu'à la prochaine écriture.
+import json
+import os
+import shutil
+import threading
+import time
+
+import progress_queries
+
+# Sélection du lecteur par configuration
+ANALYTICS_BACKEND = os.environ.get("INTELLIPATH_ANALYTICS_BACKEND", "sqlite")
+ANALYTICS_PARQUET_DIR = os.environ.get("INTELLIPATH_ANALYTICS_PARQUET_DIR")
+
+_PERIODS = ("day", "week", "month")
+# Manifeste écrit en dernier par refresh_parquet_snapshot (génération de l'instantané)
+SNAPSHOT_MANIFEST = "snapshot.json"
+
+
+class SQLiteAnalytics:
+    """Agrégations servies par les tables *_daily_rollup de SQLite"""
+
+    name = "sqlite"
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def generation(self):
+        return self.name
+
+    def summary(self, user_id):
+        return progress_queries.get_progress_summary(self.db_path, user_id)
+
+    def quiz_percentage_by_topic(self, user_id):
+        return progress_queries.quiz_percentage_by_topic(self.db_path, user_id)
+
+    def study_minutes_by_topic(self, user_id):
+        return progress_queries.study_minutes_by_topic(self.db_path, user_id)
+
+    def quiz_percentage_by_period(self, user_id, period="day"):
+        return progress_queries.quiz_percentage_by_period(self.db_path, user_id, period)
+
+    def study_minutes_by_period(self, user_id, period="day"):
+        return progress_queries.study_minutes_by_period(self.db_path, user_id, period)
+
+    def skills(self, user_id):
+        return progress_queries.fetch_rows(self.db_path, "dashboard_skills", (user_id,))
+
+    def cohort_topic_stats(self):
+        """[(sujet, apprenants, pourcentage moyen, minutes d'étude)] pour toute la cohorte"""
+        return progress_queries.fetch_rows(self.db_path, "cohort_topic_stats")
+
+
+class DuckDBAnalytics:
+    """Agrégations servies par DuckDB (attaché à SQLite ou sur un instantané Parquet)"""
+
+    name = "duckdb"
+
+    _BUCKETS = {
+        "day": "strftime(CAST({ts} AS DATE), '%Y-%m-%d')",
+        "week": "strftime(date_trunc('week', CAST({ts} AS TIMESTAMP)), '%Y-%m-%d')",
+        "month": "strftime(CAST({ts} AS TIMESTAMP), '%Y-%m')",
+    }
+
+    def __init__(self, db_path, parquet_dir=None):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("Le lecteur analytique DuckDB nécessite duckdb (pip install duckdb)") from e
+
+        self.db_path = db_path
+        self.parquet_dir = parquet_dir
+        self._conn = duckdb.connect()
+        self._local = threading.local()
+
+        if parquet_dir:
+            for table in ("quiz_results", "study_sessions", "skills"):
+                path = os.path.join(parquet_dir, f"{table}.parquet").replace("'", "''")
+                self._conn.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path}')")
+        else:
+            path = os.path.abspath(db_path).replace("'", "''")
+            self._conn.execute("INSTALL sqlite")
+            self._conn.execute("LOAD sqlite")
+            self._conn.execute(f"ATTACH '{path}' AS progress (TYPE SQLITE, READ_ONLY)")
+            for table in ("quiz_results", "study_sessions", "skills"):
+                self._conn.execute(f"CREATE VIEW {table} AS SELECT * FROM progress.{table}")
+
+    def generation(self):
+        """Lecture directe de la base: constante; instantané Parquet: date du manifeste"""
+        if not self.parquet_dir:
+            return self.name
+        try:
+            return f"parquet:{os.stat(os.path.join(self.parquet_dir, SNAPSHOT_MANIFEST)).st_mtime_ns}"
+        except FileNotFoundError:
+            # Instantané antérieur au manifeste: date du fichier Parquet le plus récent
+            return "parquet:" + str(max((entry.stat().st_mtime_ns for entry in os.scandir(self.parquet_dir)
+                                         if entry.name.endswith(".parquet")), default=0))
+
+    def _query(self, sql, params=()):
+        # Une connexion DuckDB ne doit pas être partagée entre threads: un curseur par thread
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self._conn.cursor()
+        return cursor.execute(sql, list(params)).fetchall()
+
+    def _bucket(self, period, ts):
+        if period not in self._BUCKETS:
+            raise ValueError(f"Période inconnue: {period} (attendu: {', '.join(_PERIODS)})")
+        return self._BUCKETS[period].format(ts=ts)
+
+    def summary(self, user_id):
+        quiz_total, score_sum, max_sum = self._query('''
+        SELECT COALESCE(SUM(attempts), 0), COALESCE(SUM(score), 0), COALESCE(SUM(max_score), 0)
+        FROM quiz_results WHERE user_id = ?
+        ''', (user_id,))[0]
+        study_minutes, study_count = self._query('''
+        SELECT COALESCE(SUM(duration_minutes), 0), COALESCE(SUM(sessions), 0)
+        FROM study_sessions WHERE user_id = ?
+        ''', (user_id,))[0]
+        return {
+            "quiz_count": quiz_total,
+            "avg_score": score_sum / max_sum * 100 if max_sum else 0,
+            "study_minutes": study_minutes,
+            "study_sessions": study_count,
+            "avg_session_minutes": study_minutes / study_count if study_count else 0,
+        }
+
+    def quiz_percentage_by_topic(self, user_id):
+        return self._query('''
+        SELECT topic, SUM(score) * 100.0 / SUM(max_score), SUM(attempts)
+        FROM quiz_results WHERE user_id = ?
+        GROUP BY topic ORDER BY topic
+        ''', (user_id,))
+
+    def study_minutes_by_topic(self, user_id):
+        return self._query('''
+        SELECT topic, SUM(duration_minutes) AS minutes
+        FROM study_sessions WHERE user_id = ?
+        GROUP BY topic ORDER BY minutes DESC
+        ''', (user_id,))
+
+    def quiz_percentage_by_period(self, user_id, period="day"):
+        bucket = self._bucket(period, "completion_time")
+        return self._query(f'''
+        SELECT {bucket} AS bucket, SUM(score) * 100.0 / SUM(max_score), SUM(attempts)
+        FROM quiz_results WHERE user_id = ?
+        GROUP BY bucket ORDER BY bucket
+        ''', (user_id,))
+
+    def study_minutes_by_period(self, user_id, period="day"):
+        bucket = self._bucket(period, "session_date")
+        return self._query(f'''
+        SELECT {bucket} AS bucket, SUM(duration_minutes), SUM(sessions)
+        FROM study_sessions WHERE user_id = ?
+        GROUP BY bucket ORDER BY bucket
+        ''', (user_id,))
+
+    def skills(self, user_id):
+        return self._query('''
+        SELECT skill_name, proficiency_level FROM skills WHERE user_id = ?
+        ''', (user_id,))
+
+    def cohort_topic_stats(self):
+        return self._query('''
+        WITH quiz AS (
+            SELECT topic, COUNT(DISTINCT user_id) AS learners, SUM(score) * 100.0 / SUM(max_score) AS percentage
+            FROM quiz_results GROUP BY topic
+        ), study AS (
+            SELECT topic, SUM(duration_minutes) AS minutes FROM study_sessions GROUP BY topic
+        )
+        SELECT quiz.topic, quiz.learners, quiz.percentage, COALESCE(study.minutes, 0)
+        FROM quiz LEFT JOIN study ON quiz.topic IS NOT DISTINCT FROM study.topic
+        ORDER BY quiz.topic
+        ''')
+
+
+def get_analytics_backend(db_path, backend=None, parquet_dir=None):
+    """Construit le lecteur analytique configuré (INTELLIPATH_ANALYTICS_BACKEND)"""
+    backend = backend or ANALYTICS_BACKEND
+    if backend == "sqlite":
+        return SQLiteAnalytics(db_path)
+    if backend == "duckdb":
+        return DuckDBAnalytics(db_path, parquet_dir=parquet_dir or ANALYTICS_PARQUET_DIR)
+    raise ValueError(f"Lecteur analytique inconnu: {backend} (attendu: sqlite, duckdb)")
+
+
+def refresh_parquet_snapshot(db_path, out_dir, chunk_size=None):
+    """Exporte un instantané Parquet de la progression, remplacé de façon atomique"""
+    import progress_io
+
+    staging_dir = f"{out_dir}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    report = progress_io.export_all(db_path, staging_dir, fmt="parquet",
+                                    chunk_size=chunk_size or progress_io.DEFAULT_CHUNK_SIZE)
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(staging_dir):
+        os.replace(os.path.join(staging_dir, name), os.path.join(out_dir, name))
+    os.rmdir(staging_dir)
+
+    # Manifeste remplacé après les tables: sa date change la génération lue par les caches
+    manifest_path = os.path.join(out_dir, SNAPSHOT_MANIFEST)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"generation": time.time_ns(), "tables": report}, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return report
@@ -0,0 +1,718 @@
+# benchmark.py
+# Mesures de performance d'IntelliPath (à lancer manuellement, hors de l'application)
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _timeit(func, repeat):
+    """Exécute func `repeat` fois et renvoie le temps moyen par appel en microsecondes"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def _import_time(module):
+    """Mesure le temps d'import à froid d'un module dans un processus neuf (ms)"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if output.returncode != 0:
+        return None
+    return float(output.stdout.strip()) * 1000
+
+
+def _importtime(modules):
+    """Importe des modules dans un processus neuf avec -X importtime
+
+    Renvoie le temps cumulé des imports (ms), les paquets les plus coûteux
+    (temps propre agrégé par paquet racine) et les modules non installés.
+    """
+    # Le marqueur sépare les imports du démarrage de l'interpréteur de ceux mesurés
+    code = (
+        "import sys\nmissing = []\nsys.stderr.write('--importtime--\\n')\n"
+        f"for name in {list(modules)!r}:\n"
+        "    try:\n        __import__(name)\n"
+        "    except ImportError as e:\n        missing.append(f'{name}: {e}')\n"
+        "print('\\n'.join(missing))"
+    )
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    lines = output.stderr.splitlines()
+    if "--importtime--" in lines:
+        lines = lines[lines.index("--importtime--") + 1:]
+    total_us = 0
+    packages = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative_us)  # import de premier niveau
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "heaviest_packages_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+        "missing": [line for line in output.stdout.splitlines() if line] if output.returncode == 0 else [output.stderr.strip()[-200:]],
+    }
+
+
+def _populate_progress_db(db_path, users=10, rows_per_user=200):
+    """Crée une base de progression synthétique pour les mesures"""
+    from progress_tracker import ProgressTracker
+
+    tracker = ProgressTracker(db_path=db_path)
+    conn = sqlite3.connect(db_path)
+    start = datetime.now() - timedelta(days=365)
+    for u in range(users):
+        user_id = f"bench_user_{u}"
+        conn.executemany(
+            "INSERT INTO quiz_results (user_id, topic, score, max_score, completion_time) VALUES (?, ?, ?, ?, ?)",
+            [(user_id, f"Sujet {i % 8}", i % 6, 5, start + timedelta(hours=i * 7)) for i in range(rows_per_user)]
+        )
+        conn.executemany(
+            "INSERT INTO study_sessions (user_id, topic, duration_minutes, session_date) VALUES (?, ?, ?, ?)",
+            [(user_id, f"Sujet {i % 8}", 1 + i % 30, start + timedelta(hours=i * 7)) for i in range(rows_per_user)]
+        )
+        conn.executemany(
+            "INSERT INTO skills (user_id, skill_name, proficiency_level, last_updated) VALUES (?, ?, ?, ?)",
+            [(user_id, f"Compétence {i}", 1 + i % 5, start) for i in range(12)]
+        )
+    conn.commit()
+    conn.close()
+    # Reconstruire les agrégats quotidiens à partir des lignes brutes
+    tracker.rebuild_rollups()
+    return tracker
+
+
+# Modules importés par streamlit_app.py avant l'affichage de la page de connexion
+LOGIN_PAGE_MODULES = ["streamlit", "user_manager", "chart_renderer", "progress_queries"]
+
+
+def bench_importtime(args):
+    """Coût d'import (-X importtime) des modules chargés avant la page de connexion"""
+    modules = args.modules.split(",") if args.modules else LOGIN_PAGE_MODULES
+    return {"modules": modules, **_importtime(modules)}
+
+
+def bench_queries(args):
+    """Compare pd.read_sql et la couche de requêtes légère sur les requêtes de profil"""
+    from progress_queries import QUERIES, close_connections, fetch_column, fetch_scalar, pooled_connection
+
+    results = {"import_ms": {"pandas": _import_time("pandas"), "progress_queries": _import_time("progress_queries")}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_progress.db")
+        _populate_progress_db(db_path, users=args.users, rows_per_user=args.rows)
+        params = ("bench_user_0",)
+
+        timings = {
+            "scalar_fetch_us": _timeit(lambda: fetch_scalar(db_path, "quiz_count", params), args.repeat),
+            "column_fetch_us": _timeit(lambda: fetch_column(db_path, "studied_topics", params), args.repeat),
+        }
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        if pd is not None:
+            with pooled_connection(db_path) as conn:
+                timings["scalar_read_sql_us"] = _timeit(
+                    lambda: pd.read_sql(QUERIES["quiz_count"], conn, params=params).iloc[0, 0], args.repeat)
+                timings["column_read_sql_us"] = _timeit(
+                    lambda: pd.read_sql(QUERIES["studied_topics"], conn, params=params)["topic"].tolist(),
+                    args.repeat)
+        close_connections()
+
+    results["per_call"] = timings
+    return results
+
+
+def bench_rollups(args):
+    """Compare le groupby pandas sur les lignes brutes et les agrégats SQL (un an d'historique)"""
+    from progress_queries import close_connections, study_minutes_by_period, quiz_percentage_by_topic
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_progress.db")
+        # Une session toutes les 7 heures pendant un an
+        _populate_progress_db(db_path, users=args.users, rows_per_user=max(args.rows, 1250))
+        conn = sqlite3.connect(db_path)
+        user_id = "bench_user_0"
+
+        timings = {
+            "sql_daily_us": _timeit(lambda: study_minutes_by_period(db_path, user_id, "day"), args.repeat),
+            "sql_weekly_us": _timeit(lambda: study_minutes_by_period(db_path, user_id, "week"), args.repeat),
+            "sql_quiz_by_topic_us": _timeit(lambda: quiz_percentage_by_topic(db_path, user_id), args.repeat),
+            "raw_rows_fetch_us": _timeit(lambda: conn.execute(
+                "SELECT topic, duration_minutes, session_date FROM study_sessions WHERE user_id = ?",
+                (user_id,)).fetchall(), args.repeat),
+        }
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        if pd is not None:
+            def pandas_daily():
+                df = pd.read_sql("SELECT duration_minutes, session_date FROM study_sessions WHERE user_id = ?",
+                                 conn, params=(user_id,))
+                df["date"] = pd.to_datetime(df["session_date"]).dt.date
+                return df.groupby("date")["duration_minutes"].sum()
+            timings["pandas_daily_us"] = _timeit(pandas_daily, max(1, args.repeat // 10))
+
+        buckets = len(study_minutes_by_period(db_path, user_id, "day"))
+        conn.close()
+        close_connections()
+
+    return {"daily_buckets": buckets, "per_call": timings}
+
+
+def bench_statements(args):
+    """Coût de préparation des requêtes: même SQL interpolé ou paramétré, sur une même connexion persistante"""
+    import sqlite_store
+    from progress_queries import QUERIES, STATEMENT_CACHE_SIZE, close_connections, fetch_scalar
+
+    sql = QUERIES["quiz_count"]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_progress.db")
+        _populate_progress_db(db_path, users=args.users, rows_per_user=args.rows)
+        # Un identifiant différent par appel et par passe, comme des utilisateurs distincts: un texte
+        # interpolé n'est jamais déjà dans le cache d'instructions (même si --repeat <= sa taille)
+        passes = [[f"bench_user_{n}_{i}" for i in range(args.repeat)] for n in range(3)]
+        conn = sqlite_store.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+
+        def interpolated(user_id):
+            # Texte SQL différent à chaque utilisateur: préparé à chaque appel
+            conn.execute(sql.replace("?", f"'{user_id}'")).fetchone()
+
+        def bound(user_id):
+            conn.execute(sql, (user_id,)).fetchone()
+
+        def per_call_us(func, user_ids):
+            start = time.perf_counter()
+            for user_id in user_ids:
+                func(user_id)
+            return (time.perf_counter() - start) / len(user_ids) * 1e6
+
+        # Meilleure de plusieurs passes alternées (caches du système et de SQLite chauds pour les deux)
+        timings = {"interpolated_us": float("inf"), "bound_us": float("inf")}
+        for user_ids in passes:
+            timings["interpolated_us"] = min(timings["interpolated_us"], per_call_us(interpolated, user_ids))
+            timings["bound_us"] = min(timings["bound_us"], per_call_us(bound, user_ids))
+        conn.close()
+
+        # Même requête nommée par la couche de lecture (pool de connexions du processus)
+        timings["fetch_scalar_pooled_us"] = per_call_us(
+            lambda user_id: fetch_scalar(db_path, "quiz_count", (user_id,)), passes[0])
+        close_connections()
+
+    return {"sql": " ".join(sql.split()), "calls": args.repeat, "statement_cache_size": STATEMENT_CACHE_SIZE,
+            "sqlite": sqlite3.sqlite_version, "per_call": timings}
+
+
+def bench_analytics(args):
+    """Compare les lecteurs analytiques (SQLite, DuckDB attaché, DuckDB Parquet) sur des agrégats de cohorte"""
+    from analytics_backend import get_analytics_backend, refresh_parquet_snapshot
+    from progress_queries import close_connections
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_progress.db")
+        # Par exemple --users 2000 --rows 1000 pour deux millions de lignes par table
+        _populate_progress_db(db_path, users=args.users, rows_per_user=args.rows)
+        parquet_dir = os.path.join(tmp, "snapshot")
+
+        backends = {"sqlite": lambda: get_analytics_backend(db_path, "sqlite")}
+        try:
+            import duckdb  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            started = time.perf_counter()
+            refresh_parquet_snapshot(db_path, parquet_dir)
+            snapshot_seconds = time.perf_counter() - started
+            backends["duckdb_attached"] = lambda: get_analytics_backend(db_path, "duckdb", parquet_dir=None)
+            backends["duckdb_parquet"] = lambda: get_analytics_backend(db_path, "duckdb", parquet_dir=parquet_dir)
+
+        repeat = max(1, args.repeat // 100)
+        results = {"rows_per_table": args.users * args.rows, "backends": {}}
+        for name, factory in backends.items():
+            backend = factory()
+            results["backends"][name] = {
+                "cohort_topic_stats_ms": _timeit(backend.cohort_topic_stats, repeat) / 1000,
+                "user_summary_ms": _timeit(lambda: backend.summary("bench_user_0"), repeat) / 1000,
+                "user_weekly_ms": _timeit(lambda: backend.study_minutes_by_period("bench_user_0", "week"), repeat) / 1000,
+            }
+        if "duckdb_parquet" in backends:
+            results["parquet_snapshot_seconds"] = round(snapshot_seconds, 3)
+        close_connections()
+
+    return results
+
+
+def bench_passwords(args):
+    """Connexions par seconde et par cœur selon la fonction de dérivation et son coût"""
+    import hashlib
+
+    from user_manager import derive_password_hash
+
+    settings = [("scrypt", cost) for cost in (12, 14, 15)]
+    settings += [("pbkdf2_sha256", cost) for cost in (100000, 300000, 600000)]
+    repeat = max(3, args.repeat // 100)
+    salt = "bench_salt"
+
+    # Une vérification = une dérivation, exécutée sur un seul thread (donc un cœur)
+    legacy_us = _timeit(lambda: hashlib.sha256(("password" + salt).encode()).hexdigest(), args.repeat)
+    results = {"legacy_sha256": {"verify_ms": round(legacy_us / 1000, 4), "logins_per_sec_per_core": round(1e6 / legacy_us)}}
+    for kdf, cost in settings:
+        verify_us = _timeit(lambda: derive_password_hash("password", salt, kdf, cost), repeat)
+        results[f"{kdf}:{cost}"] = {
+            "verify_ms": round(verify_us / 1000, 2),
+            "logins_per_sec_per_core": round(1e6 / verify_us, 1),
+        }
+    return {"cores": os.cpu_count(), "settings": results}
+
+
+def _percentiles(latencies):
+    """Renvoie p50, p99 et max (ms) d'une liste de latences en secondes"""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _stress_worker(task):
+    """Processus d'écriture: quiz enregistrés en continu, connexion toutes les `login_every` opérations"""
+    from progress_tracker import ProgressTracker
+    from user_manager import UserManager
+
+    db_dir, worker, operations, login_every = task
+    tracker = ProgressTracker(db_path=os.path.join(db_dir, "bench_progress.db"))
+    manager = UserManager(db_path=os.path.join(db_dir, "bench_auth.db"))
+    latencies = {"record_quiz_result": [], "login_user": []}
+    errors = {"record_quiz_result": [], "login_user": []}
+
+    for i in range(operations):
+        start = time.perf_counter()
+        try:
+            tracker.record_quiz_result(f"bench_user_{worker}", f"Sujet {i % 8}", i % 6, 5)
+        except sqlite3.Error as e:
+            errors["record_quiz_result"].append(str(e))
+        latencies["record_quiz_result"].append(time.perf_counter() - start)
+
+        if i % login_every == 0:
+            start = time.perf_counter()
+            success, result = manager.login_user(f"bench_user_{worker}", "password")
+            if not success:
+                errors["login_user"].append(result)
+            latencies["login_user"].append(time.perf_counter() - start)
+
+    return latencies, errors
+
+
+def bench_stress(args):
+    """Écritures concurrentes de plusieurs processus sur les bases de progression et d'authentification"""
+    import multiprocessing
+
+    from progress_tracker import ProgressTracker
+    from user_manager import UserManager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ProgressTracker(db_path=os.path.join(tmp, "bench_progress.db"))
+        manager = UserManager(db_path=os.path.join(tmp, "bench_auth.db"))
+        for worker in range(args.processes):
+            manager.register_user(f"bench_user_{worker}", f"bench_{worker}@example.com", "password")
+
+        tasks = [(tmp, worker, args.repeat, 10) for worker in range(args.processes)]
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            outcomes = pool.map(_stress_worker, tasks)
+        elapsed = time.perf_counter() - started
+
+    results = {"processes": args.processes, "seconds": round(elapsed, 3), "operations": {}}
+    for operation in ("record_quiz_result", "login_user"):
+        latencies = [value for worker_latencies, _ in outcomes for value in worker_latencies[operation]]
+        errors = [error for _, worker_errors in outcomes for error in worker_errors[operation]]
+        results["operations"][operation] = {
+            "count": len(latencies),
+            "errors": len(errors),
+            "error_samples": sorted(set(errors))[:3],
+            "per_sec": round(len(latencies) / elapsed, 1),
+            **_percentiles(latencies),
+        }
+    return results
+
+
+def bench_charts(args):
+    """Compare le rendu serveur (PNG matplotlib) et le rendu client (Vega-Lite): CPU serveur et octets envoyés"""
+    from chart_renderer import (quiz_history_chart, render_figure, skills_chart, study_period_chart,
+                                summary_chart, vega_lite_spec)
+
+    start = datetime.now() - timedelta(days=args.rows)
+    days = [(start + timedelta(days=i)).date().isoformat() for i in range(args.rows)]
+    topics = [f"Sujet {i}" for i in range(8)]
+    specs = {
+        "summary": summary_chart([(topic, 40.0 + i * 7, 3) for i, topic in enumerate(topics)],
+                                 [(topic, 30 + i * 5) for i, topic in enumerate(topics)]),
+        "quiz_history": quiz_history_chart([(day, 50.0 + i % 40, 1) for i, day in enumerate(days)]),
+        "study_by_day": study_period_chart([(day, 10 + i % 50, 1) for i, day in enumerate(days)], "day", "Quotidien"),
+        "skills": skills_chart([(f"Compétence {i}", 1 + i % 5) for i in range(12)]),
+    }
+    repeat = max(1, args.repeat // 100)
+
+    def measure(render):
+        cpu_start = time.process_time()
+        for _ in range(repeat):
+            payload = render()
+        return {"cpu_ms": round((time.process_time() - cpu_start) / repeat * 1000, 3), "bytes": len(payload)}
+
+    results = {"points_per_series": args.rows, "charts": {}}
+    for name, spec in specs.items():
+        results["charts"][name] = {
+            "client_vega_lite": measure(lambda: json.dumps(vega_lite_spec(spec)).encode()),
+        }
+        try:
+            results["charts"][name]["server_png"] = measure(lambda: render_figure(spec))
+        except ImportError:
+            results["charts"][name]["server_png"] = None  # matplotlib non installé
+    return results
+
+
+def _legacy_recommend(courses, profile, interests, career_goal=None, limit=5):
+    """Boucle de score d'origine de CourseRecommenderOffline (référence de comparaison)"""
+    interest_keywords = [kw.strip().lower() for kw in interests]
+    career_keywords = [career_goal.lower()] if career_goal else []
+    scored = []
+    for course in courses:
+        score = 0
+        for weakness in profile["weaknesses"]:
+            if any(weakness.lower() in skill.lower() for skill in course["skills"]):
+                score += 3
+        for keyword in interest_keywords + career_keywords:
+            if (keyword in course["title"].lower() or keyword in course["description"].lower()
+                    or any(keyword in skill.lower() for skill in course["skills"])):
+                score += 2
+        if any(topic.lower() in course["title"].lower() for topic in profile["studied_topics"]):
+            score -= 1
+        scored.append((score, course))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [course for _, course in scored[:limit]]
+
+
+_CATALOG_WORDS = [
+    "python", "données", "réseaux", "sécurité", "cloud", "web", "mobile", "statistiques", "algèbre", "éthique",
+    "apprentissage", "automatique", "profond", "visualisation", "bases", "sql", "javascript", "react", "docker",
+    "kubernetes", "linux", "cryptographie", "gestion", "projet", "agile", "économie", "marketing", "finance",
+    "santé", "énergie", "robotique", "vision", "langage", "traitement", "signal", "optimisation", "graphes",
+    "compilation", "systèmes", "distribués", "architecture", "conception", "test", "qualité", "devops", "api",
+    "microservices", "frontend", "backend", "intelligence", "artificielle", "modélisation", "analyse", "calcul",
+]
+_CATALOG_LEVELS = ["débutant", "intermédiaire", "avancé"]
+# Requêtes du benchmark recommend: (intérêts, objectif de carrière, points faibles, sujets étudiés)
+RECOMMEND_QUERIES = [
+    (["python", "données"], "data scientist", ["statistiques"], ["Python"]),
+    (["sécurité", "réseaux"], None, [], []),
+    (["apprentissage automatique"], "ingénieur en intelligence artificielle", ["algèbre", "optimisation"], []),
+    (["react", "javascript", "web"], "développeur frontend", [], ["HTML"]),
+    (["kubernetes"], "devops", ["linux"], ["Docker"]),
+]
+
+
+def _synthetic_catalog(size, seed=42):
+    """Catalogue synthétique reproductible (titres, descriptions et compétences de 54 mots)"""
+    import random
+
+    rng = random.Random(seed)
+
+    def words(count):
+        return " ".join(rng.choice(_CATALOG_WORDS) for _ in range(count))
+
+    return [{
+        "title": words(rng.randint(3, 5)).capitalize(),
+        "description": f"Cours {words(rng.randint(8, 14))}.",
+        "skills": [words(rng.randint(1, 3)) for _ in range(3)],
+        "level": rng.choice(_CATALOG_LEVELS),
+        "reason": f"Recommandé pour {words(3)}.",
+    } for _ in range(size)]
+
+
+def bench_recommend(args):
+    """Recommandations hors ligne: boucle d'origine contre index inversé, TF-IDF et plongements"""
+    import tracemalloc
+    from course_catalog import CourseCatalog, CourseIndex, load_catalog
+    from text_normalization import tokenize
+
+    courses = _synthetic_catalog(args.courses)
+    start = time.perf_counter()
+    index = CourseIndex(courses)
+    results = {"courses": args.courses, "index_build_ms": round((time.perf_counter() - start) * 1000, 1),
+               "catalog": {}, "queries": []}
+
+    # Chargement d'un fichier JSON Lines et mémoire du catalogue compact contre une liste de dictionnaires
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for course in courses:
+                f.write(json.dumps(course, ensure_ascii=False) + "\n")
+        start = time.perf_counter()
+        load_catalog(path)
+        results["catalog"]["jsonl_load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    for name, build in (("dicts_mb", lambda: [json.loads(json.dumps(course)) for course in courses]),
+                        ("compact_mb", lambda: CourseCatalog.from_courses(json.loads(json.dumps(course))
+                                                                          for course in courses))):
+        tracemalloc.start()
+        catalog = build()
+        results["catalog"][name] = round(tracemalloc.get_traced_memory()[0] / 1e6, 1)
+        tracemalloc.stop()
+        del catalog
+
+    engines = {"index": index}
+    try:
+        from course_scoring import TfidfScorer
+
+        start = time.perf_counter()
+        engines["tfidf"] = TfidfScorer(courses)
+        results["tfidf_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    except ImportError:
+        results["tfidf_build_ms"] = None  # numpy/scipy non installés
+    # Plongements par hachage écrits par l'étape hors ligne, puis relus en mémoire projetée
+    embeddings_dir = tempfile.TemporaryDirectory()
+    try:
+        from course_embeddings import EmbeddingScorer, HashingEmbedder, embed_catalog
+
+        path = os.path.join(embeddings_dir.name, "course_embeddings.npy")
+        start = time.perf_counter()
+        embed_catalog(courses, path, HashingEmbedder())
+        results["embedding_offline_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results["embedding_file_mb"] = round(os.path.getsize(path) / 1e6, 1)
+        start = time.perf_counter()
+        engines["embedding"] = EmbeddingScorer(courses, path)
+        results["embedding_open_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    except ImportError:
+        results["embedding_offline_ms"] = None  # numpy non installé
+
+    def coverage(recommended, keywords):
+        # Qualité: part des jetons de la requête présents dans chaque cours recommandé
+        wanted = {token for keyword in keywords for token in tokenize(keyword)}
+        found = [wanted & set(tokenize(" ".join([course["title"], course["description"]] + course["skills"])))
+                 for course in recommended]
+        return round(sum(len(tokens) for tokens in found) / (len(wanted) * len(found)), 3) if found else 0
+
+    repeat = max(1, args.repeat // 100)
+    for interests, career_goal, weaknesses, studied in RECOMMEND_QUERIES:
+        profile = {"strengths": [], "weaknesses": weaknesses, "studied_topics": studied}
+        keywords = interests + ([career_goal] if career_goal else [])
+        legacy = _legacy_recommend(courses, profile, interests, career_goal)
+        legacy_titles = {course["title"] for course in legacy}
+        query = {
+            "interests": interests,
+            "career_goal": career_goal,
+            "latency_ms": {"loop": round(_timeit(
+                lambda: _legacy_recommend(courses, profile, interests, career_goal), 1) / 1000, 2)},
+            "query_term_coverage": {"loop": coverage(legacy, keywords)},
+            "top5_overlap_with_loop": {},
+        }
+        for name, engine in engines.items():
+            recommended = engine.recommend(profile, interests, career_goal)
+            query["latency_ms"][name] = round(
+                _timeit(lambda: engine.recommend(profile, interests, career_goal), repeat) / 1000, 2)
+            query["query_term_coverage"][name] = coverage(recommended, keywords)
+            query["top5_overlap_with_loop"][name] = len(legacy_titles & {course["title"] for course in recommended})
+        results["queries"].append(query)
+    engines.clear()
+    embeddings_dir.cleanup()
+    return results
+
+
+# Modules mesurés à froid par le benchmark startup (les aides de streamlit_app
+# sont importées séparément: le script lui-même ne peut pas être importé)
+STARTUP_MODULES = [
+    "generating_syllabus", "teaching_agent", "quiz_generator", "intellipath_agent", "vector_store",
+    "content_extractor", "user_manager", "chart_renderer", "progress_queries", "progress_tracker",
+    "skills_analyzer", "course_recommender_offline",
+]
+
+# Composants des getters de streamlit_app.py: (imports, construction)
+STARTUP_COMPONENTS = {
+    "user_manager": ("from user_manager import UserManager", "UserManager(db_path={auth_db!r})"),
+    "progress_tracker": ("from progress_tracker import ProgressTracker", "ProgressTracker(db_path={db!r})"),
+    "quiz_generator": ("from quiz_generator import QuizGenerator", "QuizGenerator()"),
+    "course_recommender": (
+        "from progress_tracker import ProgressTracker\nfrom course_recommender_offline import CourseRecommenderOffline",
+        "CourseRecommenderOffline(ProgressTracker(db_path={db!r}))"),
+    "skills_analyzer": (
+        "from progress_tracker import ProgressTracker\nfrom skills_analyzer import SkillsAnalyzer",
+        "SkillsAnalyzer(ProgressTracker(db_path={db!r}))"),
+    "chart_renderer": ("from chart_renderer import ChartRenderer\nfrom dashboard_cache import DashboardCache",
+                       "ChartRenderer(cache=DashboardCache(cache_dir={cache_dir!r}))"),
+}
+
+# Premières requêtes servies par le faux serveur Ollama: (imports, construction, requête)
+STARTUP_REQUESTS = {
+    "quiz": ("from quiz_generator import QuizGenerator", "component = QuizGenerator()",
+             "component.generate_quiz('Python', num_questions=1)"),
+    "teaching": ("from teaching_agent import get_teaching_agent",
+                 "component = get_teaching_agent()\ncomponent.seed_agent('Syllabus', 'Python')",
+                 "component.human_step('Bonjour')\ncomponent.instructor_step()"),
+    "skills_analysis": ("from progress_tracker import ProgressTracker\nfrom skills_analyzer import SkillsAnalyzer",
+                        "component = SkillsAnalyzer(ProgressTracker(db_path={db!r}))\n"
+                        "component.progress_tracker.record_quiz_result('bench_user', 'Python', 3, 5)",
+                        "component.detailed_analysis('bench_user', 1, refresh=True)"),
+    "syllabus": ("from generating_syllabus import generate_syllabus", "pass",
+                 "generate_syllabus('Python', 'Generate a course syllabus to teach the topic: Python')"),
+}
+
+# Réponse du faux serveur: une question de quiz valide, acceptable par toutes les fonctionnalités
+FAKE_LLM_REPLY = json.dumps({
+    "question": "Quel mot-clé définit une fonction en Python?",
+    "options": ["func", "def", "lambda", "fn"],
+    "correct_answer": 1,
+    "explanation": "def introduit la définition d'une fonction.",
+})
+
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Serveur Ollama minimal: répond immédiatement à /api/generate et /api/chat"""
+    calls = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        type(self).calls += 1
+        if self.path.endswith("/api/chat"):
+            reply = {"message": {"role": "assistant", "content": FAKE_LLM_REPLY}}
+        else:
+            reply = {"response": FAKE_LLM_REPLY}
+        reply.update(model=body.get("model", "llama3"), created_at="2024-01-01T00:00:00Z",
+                     done=True, done_reason="stop")
+        self._send_json(reply, "application/x-ndjson")
+
+    def do_GET(self):
+        self._send_json({"models": [{"name": "llama3", "model": "llama3"}]}, "application/json")
+
+    def _send_json(self, payload, content_type):
+        data = (json.dumps(payload) + "\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run_probe(code, env=None):
+    """Exécute code dans un processus neuf; renvoie le JSON de sa dernière ligne ou l'erreur"""
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    lines = output.stdout.strip().splitlines()
+    if output.returncode != 0 or not lines:
+        return {"error": (output.stderr.strip().splitlines() or ["code de sortie non nul"])[-1]}
+    return json.loads(lines[-1])
+
+
+def _probe_code(imports, setup, requests=()):
+    # Chronométrage des imports, de la construction puis de chaque requête
+    lines = ["import json, time", "timings = {}", "start = time.perf_counter()", imports,
+             "timings['import_ms'] = (time.perf_counter() - start) * 1000",
+             "start = time.perf_counter()", setup,
+             "timings['construct_ms'] = (time.perf_counter() - start) * 1000"]
+    for name in requests:
+        lines += ["start = time.perf_counter()", requests[name],
+                  f"timings[{name!r}] = (time.perf_counter() - start) * 1000"]
+    lines.append("print(json.dumps({key: round(value, 1) for key, value in timings.items()}))")
+    return "\n".join(lines)
+
+
+def bench_startup(args):
+    """Démarrage à froid: imports, construction des composants et premières requêtes au LLM"""
+    repeat = max(1, args.repeat // 100)
+    results = {"repeat": repeat, "imports": {}, "components": {}, "first_requests": {}}
+
+    def median(values):
+        values = sorted(values)
+        return values[len(values) // 2] if values else None
+
+    for module in STARTUP_MODULES:
+        runs = [_importtime([module]) for _ in range(repeat)]
+        results["imports"][module] = {"cold_import_ms": median([run["total_ms"] for run in runs]),
+                                      "missing": runs[0]["missing"]}
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    env = dict(os.environ, OLLAMA_HOST=f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {"db": os.path.join(tmp, "progress.db"), "auth_db": os.path.join(tmp, "auth.db"),
+                     "cache_dir": os.path.join(tmp, "cache")}
+
+            for name, (imports, construct) in STARTUP_COMPONENTS.items():
+                code = _probe_code(imports, construct.format(**paths))
+                results["components"][name] = _run_probe(code, env)
+
+            for name, (imports, setup, request) in STARTUP_REQUESTS.items():
+                _FakeOllamaHandler.calls = 0
+                code = _probe_code(imports, setup.format(**paths),
+                                   {"first_request_ms": request, "second_request_ms": request})
+                result = _run_probe(code, env)
+                result["llm_calls"] = _FakeOllamaHandler.calls
+                results["first_requests"][name] = result
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+BENCHMARKS = {
+    "analytics": bench_analytics,
+    "charts": bench_charts,
+    "importtime": bench_importtime,
+    "passwords": bench_passwords,
+    "queries": bench_queries,
+    "recommend": bench_recommend,
+    "rollups": bench_rollups,
+    "startup": bench_startup,
+    "statements": bench_statements,
+    "stress": bench_stress,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IntelliPath - Benchmarks de performance")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS), help="Benchmark à exécuter")
+    parser.add_argument("--users", type=int, default=10, help="Nombre d'utilisateurs synthétiques")
+    parser.add_argument("--rows", type=int, default=200, help="Lignes par utilisateur et par table")
+    parser.add_argument("--repeat", type=int, default=500, help="Nombre de répétitions par mesure")
+    parser.add_argument("--processes", type=int, default=4, help="Processus concurrents (benchmark stress)")
+    parser.add_argument("--courses", type=int, default=100000, help="Taille du catalogue synthétique (benchmark recommend)")
+    parser.add_argument("--modules", help="Modules à importer, séparés par des virgules (benchmark importtime)")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer le rapport (suivi des régressions)")
+    args = parser.parse_args()
+
+    results = BENCHMARKS[args.benchmark](args)
+    report = {
+        "benchmark": args.benchmark,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# chart_renderer.py
+# Rendu des graphiques de progression hors du thread Streamlit.
+#
+# Un graphique est décrit par une spécification en données simples (type de
+# tracé, séries, titres), dessinée par matplotlib sur une Figure autonome avec
+# le canevas Agg (sans pyplot: aucun état global partagé entre sessions) et
+# renvoyée en octets PNG. Les figures sont rendues dans un pool de processus,
+# jamais dans le thread du script Streamlit, et mises en cache par version des
+# données de l'utilisateur: une page déjà vue ne redessine rien.
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from dashboard_cache import DashboardCache, dashboard_key
+
+# Processus de rendu (0: rendu dans le processus appelant, pour les scripts et les tests)
+CHART_WORKERS = int(os.environ.get("INTELLIPATH_CHART_WORKERS", min(4, os.cpu_count() or 1)))
+# "server": PNG matplotlib; "client": spécification Vega-Lite dessinée par le navigateur
+CHART_MODE = os.environ.get("INTELLIPATH_CHART_MODE", "server")
+
+
+def _draw_panel(ax, panel):
+    kind = panel["kind"]
+    if kind == "bar":
+        ax.bar(panel["x"], panel["y"], color=panel.get("color"))
+    elif kind == "barh":
+        bars = ax.barh(panel["x"], panel["y"], color=panel.get("color"))
+        if panel.get("value_labels"):
+            # Ajouter les valeurs sur les barres
+            for bar in bars:
+                width = bar.get_width()
+                ax.text(width + 0.1, bar.get_y() + bar.get_height() / 2, f'{width:.1f}', ha='left', va='center')
+    elif kind == "pie":
+        ax.pie(panel["y"], labels=panel["x"], autopct='%1.1f%%', startangle=panel.get("startangle", 0))
+    elif kind == "line":
+        x = [datetime.strptime(value, '%Y-%m-%d') for value in panel["x"]] if panel.get("dates") else panel["x"]
+        ax.plot(x, panel["y"], marker=panel.get("marker"))
+    else:
+        raise ValueError(f"Type de graphique inconnu: {kind}")
+
+    if panel.get("title"):
+        ax.set_title(panel["title"])
+    if "xlabel" in panel:
+        ax.set_xlabel(panel["xlabel"])
+    if "ylabel" in panel:
+        ax.set_ylabel(panel["ylabel"])
+    if "xlim" in panel:
+        ax.set_xlim(*panel["xlim"])
+    if "ylim" in panel:
+        ax.set_ylim(*panel["ylim"])
+    if panel.get("rotate_xticks"):
+        ax.tick_params(axis='x', labelrotation=panel["rotate_xticks"])
+    if panel.get("grid"):
+        ax.grid(True, linestyle='--', alpha=0.7)
+
+
+def render_figure(spec):
+    """Dessine une figure (grille de panneaux) et renvoie les octets PNG"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    rows, cols = spec.get("grid", (1, 1))
+    fig = Figure(figsize=spec.get("figsize", (10, 6)))
+    FigureCanvasAgg(fig)
+    for panel in spec["panels"]:
+        _draw_panel(fig.add_subplot(rows, cols, panel.get("position", 1)), panel)
+    if spec.get("autofmt_xdate"):
+        fig.autofmt_xdate()
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _vega_lite_panel(panel):
+    kind = panel["kind"]
+    values = [{"x": x, "y": y} for x, y in zip(panel["x"], panel["y"])]
+    x_axis = {"field": "x", "title": panel.get("xlabel"), "sort": None}
+    y_axis = {"field": "y", "type": "quantitative", "title": panel.get("ylabel")}
+
+    if kind == "pie":
+        view = {
+            "mark": {"type": "arc", "tooltip": True},
+            "encoding": {"theta": {"field": "y", "type": "quantitative"},
+                         "color": {"field": "x", "type": "nominal", "title": None, "sort": None}},
+        }
+    elif kind == "barh":
+        x_axis.update(type="nominal", sort="-x")  # niveau le plus élevé en haut, comme matplotlib
+        y_axis["title"] = panel.get("xlabel")
+        if "xlim" in panel:
+            y_axis["scale"] = {"domain": list(panel["xlim"])}
+        view = {
+            "mark": {"type": "bar", "tooltip": True},
+            "encoding": {"y": dict(x_axis, title=panel.get("ylabel")), "x": y_axis},
+        }
+        if panel.get("value_labels"):
+            view = {"layer": [view, {"mark": {"type": "text", "align": "left", "dx": 3},
+                                     "encoding": dict(view["encoding"], text={"field": "y", "format": ".1f"})}]}
+    else:
+        x_axis["type"] = "temporal" if panel.get("dates") else "ordinal"
+        if "ylim" in panel:
+            y_axis["scale"] = {"domain": list(panel["ylim"])}
+        mark = {"type": "bar"} if kind == "bar" else {"type": "line", "point": True}
+        mark["tooltip"] = True
+        view = {"mark": mark, "encoding": {"x": x_axis, "y": y_axis}}
+
+    if panel.get("color"):
+        (view["layer"][0] if "layer" in view else view)["mark"]["color"] = panel["color"]
+
+    view["data"] = {"values": values}
+    if panel.get("title"):
+        view["title"] = panel["title"]
+    return view
+
+
+def vega_lite_spec(spec):
+    """Convertit une figure en spécification Vega-Lite (données agrégées incluses)"""
+    views = [_vega_lite_panel(panel) for panel in spec["panels"]]
+    if len(views) == 1:
+        return views[0]
+    return {"hconcat": views}
+
+
+class ChartRenderer:
+    def __init__(self, workers=CHART_WORKERS, cache=None):
+        self.workers = workers
+        self.cache = cache or DashboardCache()
+        self._pool = None
+
+    def _get_pool(self):
+        # "spawn": pas de fork d'un serveur Streamlit multi-thread
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def render(self, specs):
+        """Dessine des figures {nom: spécification} dans le pool de processus et renvoie {nom: PNG}"""
+        if not self.workers:
+            return {name: render_figure(spec) for name, spec in specs.items()}
+        futures = {name: self._get_pool().submit(render_figure, spec) for name, spec in specs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    def render_charts(self, user_id, data_version, specs):
+        """Renvoie {nom: PNG} pour des spécifications {nom: figure}, en ne dessinant que les absentes du cache"""
+        keys = {name: dashboard_key(name, user_id, data_version) for name in specs}
+        images = {name: self.cache.get(key) for name, key in keys.items()}
+        missing = [name for name, data in images.items() if data is None]
+
+        rendered = self.render({name: specs[name] for name in missing})
+        for name, data in rendered.items():
+            self.cache.set(keys[name], data)
+            images[name] = data
+        return images
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# Spécifications des graphiques de progression
+
+def summary_chart(quiz_by_topic, study_by_topic):
+    """Performance par sujet (barres) et répartition du temps d'étude (camembert)"""
+    panels = []
+    if quiz_by_topic:
+        topics, percentages, _ = zip(*quiz_by_topic)
+        panels.append({"kind": "bar", "position": 1, "x": list(topics), "y": list(percentages),
+                       "color": "skyblue", "title": "Performance par sujet (%)", "ylabel": "Score moyen (%)",
+                       "xlabel": "Sujet", "ylim": (0, 100), "rotate_xticks": 90})
+    if study_by_topic:
+        topics, minutes = zip(*study_by_topic)
+        panels.append({"kind": "pie", "position": 2, "x": list(topics), "y": list(minutes), "startangle": 90,
+                       "title": "Répartition du temps d'étude", "ylabel": ""})
+    return {"figsize": (12, 6), "grid": (1, 2), "panels": panels}
+
+
+def quiz_history_chart(quiz_by_day):
+    """Évolution du score moyen quotidien"""
+    days, percentages, _ = zip(*quiz_by_day)
+    return {"figsize": (10, 6), "autofmt_xdate": True, "panels": [
+        {"kind": "line", "x": list(days), "y": list(percentages), "dates": True, "marker": "o",
+         "xlabel": "Date", "ylabel": "Score (%)", "ylim": (0, 100), "grid": True},
+    ]}
+
+
+def study_period_chart(study_by_period, period, period_label):
+    """Temps d'étude par jour ou par semaine"""
+    periods, minutes, _ = zip(*study_by_period)
+    return {"figsize": (10, 6), "panels": [
+        {"kind": "bar", "x": list(periods), "y": list(minutes), "color": "green",
+         "xlabel": "Date" if period == "day" else "Semaine du", "ylabel": "Temps d'étude (minutes)",
+         "title": f"Temps d'étude {period_label.lower()}", "rotate_xticks": 90},
+    ]}
+
+
+def skills_chart(skills):
+    """Niveaux de compétence [(nom, niveau)] en barres horizontales triées"""
+    skills = sorted(skills, key=lambda skill: skill[1])
+    names, levels = zip(*skills)
+    return {"figsize": (10, max(6, len(skills) * 0.5)), "panels": [
+        {"kind": "barh", "x": list(names), "y": list(levels), "color": "purple", "value_labels": True,
+         "xlabel": "Niveau de compétence (1-5)", "xlim": (0, 5.5), "title": "Niveaux de compétence par sujet"},
+    ]}
+
+
+def dashboard_chart(quiz_by_topic, study_by_topic, skills):
+    """Tableau de bord complet: performance, temps d'étude et compétences"""
+    panels = []
+    if quiz_by_topic:
+        topics, percentages, _ = zip(*quiz_by_topic)
+        panels.append({"kind": "bar", "position": 1, "x": list(topics), "y": list(percentages),
+                       "rotate_xticks": 90, "title": "Performance par sujet (%)",
+                       "ylabel": "Score moyen (%)", "xlabel": "Sujet"})
+    if study_by_topic:
+        topics, minutes = zip(*study_by_topic)
+        panels.append({"kind": "pie", "position": 2, "x": list(topics), "y": list(minutes),
+                       "title": "Répartition du temps d'étude", "ylabel": ""})
+    if skills:
+        skill_names, levels = zip(*skills)
+        panels.append({"kind": "barh", "position": 3, "x": list(skill_names), "y": list(levels),
+                       "title": "Niveau de compétence", "xlabel": "Niveau (1-5)", "ylabel": "Compétence"})
+    return {"figsize": (12, 8), "grid": (2, 2), "panels": panels}
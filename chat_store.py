@@ -0,0 +1,76 @@
+# chat_store.py
+# Historique des conversations avec l'instructeur (page "Cours").
+#
+# Chaque message est enregistré dans SQLite au fil de l'eau; la session
+# Streamlit ne garde que les derniers messages affichés. Les messages plus
+# anciens sont relus par pages, à la demande, via l'index
+# (conversation_id, message_id): le coût d'un rendu ne dépend pas de la
+# longueur de la conversation.
+import os
+from datetime import datetime, timedelta
+
+from schema_migrations import migrate
+from sqlite_store import connect, run_write
+
+
+def _create_chat_messages(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        conversation_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_chat_messages_conversation
+    ON chat_messages (conversation_id, message_id)
+    ''')
+
+
+MIGRATIONS = [_create_chat_messages]
+
+# Durée de conservation des messages (jours), purgés au démarrage du processus
+CHAT_RETENTION_DAYS = int(os.environ.get("INTELLIPATH_CHAT_RETENTION_DAYS", "30"))
+
+
+class ChatStore:
+    def __init__(self, db_path="chat_history.db"):
+        self.db_path = db_path
+        migrate(db_path, MIGRATIONS, journal_mode="WAL")
+        self.purge_expired()
+
+    def append(self, conversation_id, role, content):
+        """Enregistre un message et renvoie le message tel qu'affiché (avec son identifiant)"""
+        def insert(cursor):
+            cursor.execute(
+                "INSERT INTO chat_messages (conversation_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (conversation_id, role, content, datetime.now().isoformat())
+            )
+            return cursor.lastrowid
+
+        return {"id": run_write(self.db_path, insert), "role": role, "content": content}
+
+    def recent(self, conversation_id, limit, before_id=None):
+        """Renvoie au plus `limit` messages antérieurs à before_id, dans l'ordre chronologique"""
+        conn = connect(self.db_path)
+        try:
+            rows = conn.execute(
+                '''
+                SELECT message_id, role, content FROM chat_messages
+                WHERE conversation_id = ? AND message_id < ?
+                ORDER BY message_id DESC LIMIT ?
+                ''',
+                (conversation_id, before_id if before_id is not None else 2 ** 63 - 1, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"id": message_id, "role": role, "content": content} for message_id, role, content in reversed(rows)]
+
+    def purge_expired(self, retention_days=CHAT_RETENTION_DAYS):
+        """Supprime les messages plus anciens que la durée de conservation; renvoie leur nombre"""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        return run_write(self.db_path, lambda cursor: cursor.execute(
+            "DELETE FROM chat_messages WHERE created_at < ?", (cutoff,)
+        ).rowcount)
@@ -3,7 +3,6 @@ import requests
 from bs4 import BeautifulSoup
 import PyPDF2
 import io
-import pandas as pd
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 from langchain_ollama import OllamaLLM
@@ -12,8 +11,15 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 class ContentExtractor:
     def __init__(self, vector_store):
         self.vector_store = vector_store
-        self.llm = OllamaLLM(model="llama3", temperature=0.1)
+        self._llm = None
         self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+
+    @property
+    def llm(self):
+        """Modèle créé à la première analyse de contenu"""
+        if self._llm is None:
+            self._llm = OllamaLLM(model="llama3", temperature=0.1)
+        return self._llm
     
     def extract_from_url(self, url):
         """Extrait le contenu d'une URL et l'ajoute à la base vectorielle"""
@@ -0,0 +1,431 @@
+# course_catalog.py
+# Catalogue de cours du recommandeur hors ligne et son index inversé.
+#
+# Titres, descriptions et compétences sont découpés en jetons normalisés
+# (minuscules, accents retirés: text_normalization). L'index associe chaque jeton à la liste des
+# cours qui le contiennent, avec un masque des champs où il apparaît: un
+# mot-clé ne parcourt que les listes de ses jetons, et son poids dépend du
+# champ trouvé (un point faible ne compte que s'il correspond à une
+# compétence du cours, et compte davantage qu'un intérêt).
+#
+# Le catalogue peut être servi depuis un fichier (JSON Lines, CSV ou SQLite,
+# INTELLIPATH_COURSE_CATALOG). Il est chargé au premier usage dans une
+# représentation compacte, puis rechargé en arrière-plan quand le fichier
+# change: le nouvel index est construit hors de tout verrou et publié d'un
+# seul coup, les requêtes en cours terminant sur l'instantané précédent.
+# Pour un remplacement sûr, écrire le nouveau fichier à côté puis le renommer.
+import bisect
+import collections
+import csv
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from collections.abc import Sequence
+
+from text_normalization import tokenize
+
+# Fichier du catalogue (.jsonl, .csv, .db/.sqlite); catalogue prédéfini si absent
+COURSE_CATALOG_PATH = os.environ.get("INTELLIPATH_COURSE_CATALOG")
+# Intervalle de vérification des modifications du fichier (secondes, 0: jamais)
+CATALOG_POLL_SECONDS = float(os.environ.get("INTELLIPATH_CATALOG_POLL_SECONDS", "30"))
+# Séparateur des compétences dans les colonnes CSV et SQLite
+SKILL_SEPARATOR = ";"
+# Moteur de score: "index" (index inversé, sans dépendance), "tfidf" (NumPy/SciPy, course_scoring.py)
+# ou "embedding" (plongements précalculés, course_embeddings.py)
+RECOMMENDER_ENGINE = os.environ.get("INTELLIPATH_RECOMMENDER_ENGINE", "index")
+# Recommandations conservées (utilisateur, version du profil, requête, version du catalogue)
+RECOMMENDATION_CACHE_ENTRIES = int(os.environ.get("INTELLIPATH_RECOMMENDATION_CACHE_ENTRIES", "1000"))
+
+# Base de données de cours prédéfinis
+PREDEFINED_COURSES = [
+    {
+        "title": "Introduction à la Programmation Python",
+        "description": "Un cours complet pour débutants en Python couvrant les bases de la programmation.",
+        "skills": ["Programmation Python", "Algortihmes de base", "Structures de données"],
+        "level": "débutant",
+        "reason": "Excellent point de départ pour les débutants en programmation."
+    },
+    {
+        "title": "Data Science avec Python",
+        "description": "Apprenez à analyser des données avec pandas, NumPy et matplotlib.",
+        "skills": ["Analyse de données", "Visualisation de données", "Python pour la data science"],
+        "level": "intermédiaire",
+        "reason": "Parfait pour ceux qui souhaitent se spécialiser dans l'analyse de données."
+    },
+    {
+        "title": "Machine Learning: Les Fondamentaux",
+        "description": "Une introduction aux concepts et algorithmes d'apprentissage automatique.",
+        "skills": ["Machine Learning", "Algorithmes supervisés", "Évaluation de modèles"],
+        "level": "intermédiaire",
+        "reason": "Idéal pour ceux qui veulent comprendre comment fonctionnent les algorithmes de ML."
+    },
+    {
+        "title": "Deep Learning avec TensorFlow",
+        "description": "Création et entraînement de réseaux de neurones profonds pour diverses applications.",
+        "skills": ["Deep Learning", "TensorFlow", "Réseaux de neurones"],
+        "level": "avancé",
+        "reason": "Pour ceux qui souhaitent maîtriser les techniques avancées d'IA."
+    },
+    {
+        "title": "Développement Web Frontend",
+        "description": "Apprentissage de HTML, CSS et JavaScript pour créer des sites web interactifs.",
+        "skills": ["HTML/CSS", "JavaScript", "Responsive Design"],
+        "level": "débutant",
+        "reason": "Excellente introduction au développement web frontend."
+    },
+    {
+        "title": "React: Créer des Applications Web Modernes",
+        "description": "Développement d'applications web dynamiques avec React et son écosystème.",
+        "skills": ["React", "JavaScript moderne", "Gestion d'état"],
+        "level": "intermédiaire",
+        "reason": "Pour les développeurs web qui souhaitent maîtriser un framework moderne."
+    },
+    {
+        "title": "DevOps et CI/CD",
+        "description": "Automatisation du déploiement et de l'intégration continue pour les applications.",
+        "skills": ["Docker", "CI/CD", "GitHub Actions"],
+        "level": "avancé",
+        "reason": "Pour les développeurs qui veulent automatiser le cycle de vie des applications."
+    },
+    {
+        "title": "Cybersécurité: Protéger vos Applications",
+        "description": "Comprendre les vulnérabilités et protéger vos applications contre les attaques.",
+        "skills": ["Sécurité web", "Cryptographie", "Analyse de vulnérabilités"],
+        "level": "intermédiaire",
+        "reason": "Essentiel pour tout développeur conscient des enjeux de sécurité."
+    },
+    {
+        "title": "Bases de Données SQL et NoSQL",
+        "description": "Maîtrisez les différents types de bases de données et leurs cas d'utilisation.",
+        "skills": ["SQL", "MongoDB", "Modélisation de données"],
+        "level": "intermédiaire",
+        "reason": "Fondamental pour comprendre comment stocker et gérer efficacement les données."
+    },
+    {
+        "title": "Intelligence Artificielle pour l'Entreprise",
+        "description": "Applications pratiques de l'IA dans différents secteurs d'activité.",
+        "skills": ["IA appliquée", "Études de cas", "Éthique en IA"],
+        "level": "intermédiaire",
+        "reason": "Idéal pour comprendre la valeur commerciale de l'IA."
+    }
+]
+
+
+# Champs indexés (bits du masque associé à chaque cours dans une liste)
+TITLE = 1
+DESCRIPTION = 2
+SKILLS = 4
+ALL_FIELDS = TITLE | DESCRIPTION | SKILLS
+
+# Poids des critères de pertinence
+WEAKNESS_WEIGHT = 3  # Priorité plus élevée pour combler les lacunes
+INTEREST_WEIGHT = 2
+CAREER_WEIGHT = 2
+STUDIED_PENALTY = -1  # Éviter de recommander des sujets déjà étudiés
+
+# Longueur minimale d'un jeton de recherche étendu aux jetons qui le prolongent
+# ("program" trouve "programmation"); les jetons plus courts doivent être exacts
+MIN_PREFIX_LENGTH = 3
+
+class CourseCatalog(Sequence):
+    """Catalogue compact: champs en listes et tableaux, compétences et niveaux internés
+
+    Un cours n'est matérialisé en dictionnaire qu'à la lecture (catalog[i]).
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.descriptions = []
+        self.reasons = []
+        self.level_names = []
+        self.levels = array("H")  # indice dans level_names
+        self.skill_names = []
+        self.skill_ids = array("I")  # compétences de tous les cours, à la suite
+        self.skill_offsets = array("I", [0])  # cours i: skill_ids[skill_offsets[i]:skill_offsets[i + 1]]
+        self._level_ids = {}
+        self._skill_ids = {}
+
+    @classmethod
+    def from_courses(cls, courses):
+        catalog = cls()
+        for course in courses:
+            catalog.add(course["title"], course["description"], course["skills"],
+                        course.get("level", ""), course.get("reason", ""))
+        return catalog
+
+    def _intern(self, table, names, value):
+        value_id = table.get(value)
+        if value_id is None:
+            value_id = table[value] = len(names)
+            names.append(value)
+        return value_id
+
+    def add(self, title, description, skills, level="", reason=""):
+        self.titles.append(title)
+        self.descriptions.append(description)
+        self.reasons.append(reason)
+        self.levels.append(self._intern(self._level_ids, self.level_names, level))
+        self.skill_ids.extend(self._intern(self._skill_ids, self.skill_names, skill) for skill in skills)
+        self.skill_offsets.append(len(self.skill_ids))
+
+    def course_skills(self, course_id):
+        start, end = self.skill_offsets[course_id], self.skill_offsets[course_id + 1]
+        return [self.skill_names[skill_id] for skill_id in self.skill_ids[start:end]]
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, course_id):
+        if course_id < 0:
+            course_id += len(self)
+        if not 0 <= course_id < len(self):
+            raise IndexError("indice de cours hors du catalogue")
+        return {
+            "title": self.titles[course_id],
+            "description": self.descriptions[course_id],
+            "skills": self.course_skills(course_id),
+            "level": self.level_names[self.levels[course_id]],
+            "reason": self.reasons[course_id],
+        }
+
+
+def _split_skills(value):
+    if isinstance(value, list):
+        return value
+    value = (value or "").strip()
+    if value.startswith("["):
+        return json.loads(value)
+    return [skill.strip() for skill in value.split(SKILL_SEPARATOR) if skill.strip()]
+
+
+def _read_rows(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif extension in (".db", ".sqlite", ".sqlite3"):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute("SELECT title, description, skills, level, reason FROM courses"):
+                yield dict(row)
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"Format de catalogue inconnu: {path} (attendu: .jsonl, .csv, .db, .sqlite)")
+
+
+def load_catalog(path):
+    """Charge un catalogue JSON Lines, CSV ou SQLite (table courses) en lisant les cours au fil de l'eau
+
+    Champs: title, description, skills (liste JSON ou valeurs séparées par
+    SKILL_SEPARATOR), level et reason (facultatifs).
+    """
+    catalog = CourseCatalog()
+    for line_number, row in enumerate(_read_rows(path), start=1):
+        try:
+            catalog.add(row["title"], row["description"], _split_skills(row["skills"]),
+                        row.get("level") or "", row.get("reason") or "")
+        except KeyError as e:
+            raise ValueError(f"{path}: champ {e} manquant (cours {line_number})") from e
+    return catalog
+
+
+class CourseIndex:
+    def __init__(self, courses):
+        self.courses = courses
+        postings = {}
+        for course_id, course in enumerate(courses):
+            fields = [(TITLE, course["title"]), (DESCRIPTION, course["description"])]
+            fields += [(SKILLS, skill) for skill in course["skills"]]
+            masks = {}
+            for field, text in fields:
+                for token in tokenize(text):
+                    masks[token] = masks.get(token, 0) | field
+            for token, mask in masks.items():
+                ids, field_masks = postings.setdefault(token, ([], []))
+                ids.append(course_id)
+                field_masks.append(mask)
+
+        # Listes compactes (identifiants croissants) et vocabulaire trié pour les préfixes
+        self._postings = {token: (array("I", ids), array("B", field_masks))
+                          for token, (ids, field_masks) in postings.items()}
+        self._vocabulary = sorted(self._postings)
+
+    def _expand(self, token):
+        if len(token) < MIN_PREFIX_LENGTH:
+            return [token] if token in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + "\uffff")
+        return self._vocabulary[start:end]
+
+    def _token_matches(self, token):
+        matches = {}
+        for expanded in self._expand(token):
+            ids, field_masks = self._postings[expanded]
+            for course_id, mask in zip(ids, field_masks):
+                matches[course_id] = matches.get(course_id, 0) | mask
+        return matches
+
+    def match(self, keyword, fields=ALL_FIELDS):
+        """Renvoie {cours: masque} des cours contenant tous les jetons du mot-clé dans les champs donnés"""
+        tokens = tokenize(keyword)
+        if not tokens:
+            return {}
+        # Commencer par le jeton le moins fréquent: les suivants ne font que filtrer
+        token_matches = sorted((self._token_matches(token) for token in tokens), key=len)
+        matches = {course_id: mask & fields for course_id, mask in token_matches[0].items() if mask & fields}
+        for other in token_matches[1:]:
+            matches = {course_id: mask & other[course_id] for course_id, mask in matches.items()
+                       if mask & other.get(course_id, 0)}
+        return matches
+
+    def scores(self, profile, interests, career_goal=None):
+        """Scores de pertinence des seuls cours concernés par le profil ou la recherche"""
+        scores = {}
+
+        def add(keyword, weight, fields):
+            for course_id in self.match(keyword, fields):
+                scores[course_id] = scores.get(course_id, 0) + weight
+
+        # Vérifier si le cours correspond aux points faibles de l'utilisateur
+        for weakness in profile["weaknesses"]:
+            add(weakness, WEAKNESS_WEIGHT, SKILLS)
+        # Vérifier si le cours correspond aux intérêts et à l'objectif de carrière
+        for interest in interests:
+            add(interest, INTEREST_WEIGHT, ALL_FIELDS)
+        if career_goal:
+            add(career_goal, CAREER_WEIGHT, ALL_FIELDS)
+
+        # Pénalité unique par cours, quel que soit le nombre de sujets étudiés trouvés dans le titre
+        studied = set()
+        for topic in profile["studied_topics"]:
+            studied.update(self.match(topic, TITLE))
+        for course_id in studied:
+            scores[course_id] = scores.get(course_id, 0) + STUDIED_PENALTY
+        return scores
+
+    def top(self, scores, limit=5):
+        """Meilleurs cours; à score égal, ordre du catalogue (cours sans correspondance à 0)"""
+        ranked = heapq.nsmallest(limit, ((-score, course_id) for course_id, score in scores.items() if score > 0))
+        selected = [course_id for _, course_id in ranked]
+
+        course_id = 0
+        while len(selected) < limit and course_id < len(self.courses):
+            if scores.get(course_id, 0) == 0:
+                selected.append(course_id)
+            course_id += 1
+
+        if len(selected) < limit:
+            negatives = ((-score, course_id) for course_id, score in scores.items() if score < 0)
+            selected += [course_id for _, course_id in heapq.nsmallest(limit - len(selected), negatives)]
+        return selected
+
+    def recommend(self, profile, interests, career_goal=None, limit=5):
+        """Renvoie les `limit` cours les plus pertinents (copies des entrées du catalogue)"""
+        return [dict(self.courses[course_id])
+                for course_id in self.top(self.scores(profile, interests, career_goal), limit)]
+
+
+def build_scorer(courses, engine=None):
+    """Construit le moteur de score configuré (INTELLIPATH_RECOMMENDER_ENGINE) pour un catalogue"""
+    engine = engine or RECOMMENDER_ENGINE
+    if engine == "index":
+        return CourseIndex(courses)
+    if engine == "tfidf":
+        from course_scoring import TfidfScorer
+        return TfidfScorer(courses)
+    if engine == "embedding":
+        from course_embeddings import EmbeddingScorer
+        return EmbeddingScorer(courses)
+    raise ValueError(f"Moteur de recommandation inconnu: {engine} (attendu: index, tfidf, embedding)")
+
+
+CatalogSnapshot = collections.namedtuple("CatalogSnapshot", ["catalog", "scorer", "version", "signature"])
+
+
+class CatalogSource:
+    """Catalogue et index chargés au premier usage, rechargés quand le fichier change"""
+
+    def __init__(self, path=COURSE_CATALOG_PATH, poll_interval=CATALOG_POLL_SECONDS, engine=None):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.engine = engine
+        self._snapshot = None
+        self._failed_signature = None  # fichier invalide: pas de nouvel essai avant sa prochaine modification
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._watcher_stop = threading.Event()
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, version):
+        if not self.path:
+            catalog = CourseCatalog.from_courses(PREDEFINED_COURSES)
+            return CatalogSnapshot(catalog, build_scorer(catalog, self.engine), version, None)
+        signature = self._signature()
+        catalog = load_catalog(self.path)
+        return CatalogSnapshot(catalog, build_scorer(catalog, self.engine), version, signature)
+
+    def get(self):
+        """Renvoie l'instantané courant (catalogue, moteur de score, version); le premier appel le charge"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(version=1)
+                    if self.path and self.poll_interval:
+                        self.start_watcher()
+                snapshot = self._snapshot
+        return snapshot
+
+    def reload_if_changed(self):
+        """Recharge le catalogue si le fichier a changé; renvoie True si un nouvel instantané est publié"""
+        current = self._snapshot
+        if not self.path or current is None:
+            return False
+        signature = self._signature()
+        if signature in (current.signature, self._failed_signature):
+            return False
+        # Construction hors verrou: les requêtes continuent sur l'instantané courant
+        try:
+            self._snapshot = self._load(version=current.version + 1)
+        except (ValueError, csv.Error, sqlite3.Error):
+            self._failed_signature = signature
+            raise
+        return True
+
+    def start_watcher(self):
+        """Démarre la surveillance du fichier du catalogue dans un thread d'arrière-plan"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        self._watcher_stop.clear()
+
+        def watch():
+            while not self._watcher_stop.wait(self.poll_interval):
+                try:
+                    self.reload_if_changed()
+                except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+                    # Fichier en cours d'écriture ou invalide: l'instantané courant reste servi
+                    print(f"Erreur lors du rechargement du catalogue: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stop_watcher(self):
+        self._watcher_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,246 @@
+# course_embeddings.py
+# Recommandations sémantiques par plongements précalculés du catalogue
+# (INTELLIPATH_RECOMMENDER_ENGINE=embedding).
+#
+# Une étape hors ligne plonge chaque cours (titre, description, compétences)
+# une seule fois dans une matrice float16 enregistrée au format .npy, puis
+# ouverte en mémoire projetée (np.load(mmap_mode="r")): le chargement ne lit
+# pas le fichier, les pages sont partagées entre processus. Une requête est
+# plongée par le même modèle, et les scores de tous les cours sont un seul
+# produit matrice-vecteur suivi d'un argpartition.
+#
+# Le modèle est un SentenceTransformer installé localement; à défaut, un
+# vectoriseur par hachage (mots, trigrammes de caractères, sigles des groupes
+# de mots consécutifs: "Intelligence Artificielle" produit aussi "ia") sert
+# de repli sans dépendance autre que NumPy (requirements-optional.txt).
+#
+#   python course_embeddings.py --catalog courses.jsonl --output course_embeddings.npy
+import argparse
+import hashlib
+import json
+import os
+import zlib
+
+from course_catalog import (
+    CAREER_WEIGHT, COURSE_CATALOG_PATH, INTEREST_WEIGHT, STUDIED_PENALTY, WEAKNESS_WEIGHT,
+    CourseCatalog, PREDEFINED_COURSES, load_catalog
+)
+from text_normalization import tokenize
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("Les plongements du catalogue nécessitent NumPy (pip install numpy)") from e
+
+# Matrice des plongements (.npy) et ses métadonnées (même nom, extension .json)
+COURSE_EMBEDDINGS_PATH = os.environ.get("INTELLIPATH_COURSE_EMBEDDINGS", "course_embeddings.npy")
+# Modèle SentenceTransformer, ou "hashing" pour le vectoriseur sans modèle
+EMBEDDING_MODEL = os.environ.get("INTELLIPATH_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+HASHING_MODEL = "hashing"
+HASHING_DIMENSIONS = 512
+# Cours plongés par lot (étape hors ligne) et lignes par bloc du produit matrice-vecteur
+EMBED_BATCH_SIZE = 256
+SCORE_BLOCK_ROWS = 4096
+
+# float16 -> float32 par table (indexée par les 16 bits): plus rapide que astype sans conversion matérielle
+_FLOAT16_TABLE = np.arange(65536, dtype=np.uint16).view(np.float16).astype(np.float32)
+
+
+def course_text(course):
+    return " ".join([course["title"], course["description"]] + list(course["skills"]))
+
+
+def catalog_fingerprint(courses):
+    """Empreinte du contenu du catalogue: des plongements ne servent qu'au catalogue qui les a produits"""
+    digest = hashlib.blake2b(digest_size=16)
+    for course in courses:
+        digest.update(course_text(course).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _metadata_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+class HashingEmbedder:
+    """Vectoriseur par hachage signé, normalisé L2, stable d'un processus à l'autre (CRC32)"""
+
+    name = HASHING_MODEL
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+        self._tokens = {}  # jeton -> [(colonne, valeur signée)] de ses caractéristiques
+
+    def _bucket(self, feature, weight):
+        value = zlib.crc32(feature.encode("utf-8"))
+        return value % self.dimensions, weight if value & 0x80000000 else -weight
+
+    def _token_features(self, token):
+        features = self._tokens.get(token)
+        if features is None:
+            padded = f"<{token}>"
+            features = [self._bucket("w:" + token, 1.0)]
+            features += [self._bucket("c:" + padded[i:i + 3], 0.3) for i in range(len(padded) - 2)]
+            self._tokens[token] = features
+        return features
+
+    def _features(self, text):
+        tokens = tokenize(text)
+        features = [feature for token in tokens for feature in self._token_features(token)]
+        # Sigles des groupes de 2 ou 3 mots significatifs, comptés comme des mots
+        initials = [token[0] for token in tokens if len(token) > 2]
+        acronyms = [a + b for a, b in zip(initials, initials[1:])]
+        acronyms += [a + b + c for a, b, c in zip(initials, initials[1:], initials[2:])]
+        features += [self._token_features(acronym)[0] for acronym in acronyms]
+        return features
+
+    def encode(self, texts):
+        cells, values = [], []
+        for row, text in enumerate(texts):
+            offset = row * self.dimensions
+            for column, value in self._features(text):
+                cells.append(offset + column)
+                values.append(value)
+        vectors = np.bincount(cells, weights=values, minlength=len(texts) * self.dimensions)
+        vectors = vectors.reshape(len(texts), self.dimensions).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("Le modèle de plongements nécessite sentence-transformers "
+                              "(pip install sentence-transformers)") from e
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder(model_name=EMBEDDING_MODEL, dimensions=HASHING_DIMENSIONS):
+    """Renvoie le modèle demandé, ou le vectoriseur par hachage s'il n'est pas disponible localement"""
+    if model_name == HASHING_MODEL:
+        return HashingEmbedder(dimensions)
+    try:
+        return SentenceTransformerEmbedder(model_name)
+    except (ImportError, OSError) as e:
+        print(f"Modèle de plongements {model_name} indisponible ({e}), repli sur le vectoriseur par hachage")
+        return HashingEmbedder(dimensions)
+
+
+def _encode_catalog(embedder, courses, matrix, batch_size=EMBED_BATCH_SIZE):
+    for start in range(0, len(courses), batch_size):
+        texts = [course_text(courses[i]) for i in range(start, min(start + batch_size, len(courses)))]
+        matrix[start:start + len(texts)] = embedder.encode(texts)
+    return matrix
+
+
+def embed_catalog(courses, output_path=COURSE_EMBEDDINGS_PATH, embedder=None, batch_size=EMBED_BATCH_SIZE):
+    """Plonge le catalogue dans une matrice float16 .npy (écrite à côté puis renommée) et renvoie ses métadonnées"""
+    embedder = embedder or get_embedder()
+    tmp_path = output_path + ".tmp.npy"
+    matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float16,
+                                       shape=(len(courses), embedder.dimensions))
+    _encode_catalog(embedder, courses, matrix, batch_size).flush()
+    del matrix
+    os.replace(tmp_path, output_path)
+
+    metadata = {"model": embedder.name, "dimensions": embedder.dimensions,
+                "courses": len(courses), "fingerprint": catalog_fingerprint(courses)}
+    metadata_path = _metadata_path(output_path)
+    with open(metadata_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+    os.replace(metadata_path + ".tmp", metadata_path)
+    return metadata
+
+
+class EmbeddingScorer:
+    def __init__(self, courses, embeddings_path=COURSE_EMBEDDINGS_PATH):
+        self.courses = courses
+        self.embedder = None
+        self.embeddings = None
+        if embeddings_path:
+            self._open(embeddings_path)
+        if self.embeddings is None:
+            # Pas de plongements à jour: catalogue plongé en mémoire par le vectoriseur de repli
+            self.embedder = HashingEmbedder()
+            self.embeddings = _encode_catalog(self.embedder, courses,
+                                              np.empty((len(courses), self.embedder.dimensions), dtype=np.float16))
+
+    def _open(self, path):
+        try:
+            with open(_metadata_path(path), encoding="utf-8") as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            print(f"Plongements du catalogue absents ({path}): calcul en mémoire avec le vectoriseur par hachage")
+            return
+        if metadata["courses"] != len(self.courses) or metadata["fingerprint"] != catalog_fingerprint(self.courses):
+            print(f"Plongements {path} produits pour un autre catalogue: calcul en mémoire avec le vectoriseur par hachage")
+            return
+        embedder = get_embedder(metadata["model"], metadata["dimensions"])
+        if embedder.name != metadata["model"]:
+            return  # modèle indisponible: les requêtes ne seraient pas dans le même espace
+        self.embedder = embedder
+        self.embeddings = np.load(path, mmap_mode="r")
+
+    def _query_vector(self, profile, interests, career_goal):
+        """Somme pondérée des mots-clés plongés: un seul vecteur pour toute la requête"""
+        groups = [(interests, INTEREST_WEIGHT), ([career_goal] if career_goal else [], CAREER_WEIGHT),
+                  (profile["weaknesses"], WEAKNESS_WEIGHT), (profile["studied_topics"], STUDIED_PENALTY)]
+        texts = [text for keywords, _ in groups for text in keywords if text]
+        weights = np.asarray([weight for keywords, weight in groups for text in keywords if text], dtype=np.float32)
+        if not texts:
+            return None
+        return weights @ self.embedder.encode(texts)
+
+    def scores(self, profile, interests, career_goal=None):
+        """Similarité de chaque cours avec la requête (tableau NumPy)"""
+        scores = np.zeros(len(self.courses), dtype=np.float32)
+        query = self._query_vector(profile, interests, career_goal)
+        if query is None:
+            return scores
+        # Par blocs: seul un bloc du float16 projeté est converti en float32 (produit BLAS) à la fois
+        for start in range(0, len(self.courses), SCORE_BLOCK_ROWS):
+            block = np.take(_FLOAT16_TABLE, self.embeddings[start:start + SCORE_BLOCK_ROWS].view(np.uint16))
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def top(self, scores, limit=5):
+        """Meilleurs scores par argpartition, à égalité dans l'ordre du catalogue"""
+        if len(scores) > limit:
+            candidates = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.lexsort((candidates, -scores[candidates]))].tolist()
+
+    def recommend(self, profile, interests, career_goal=None, limit=5):
+        """Renvoie les `limit` cours les plus proches de la requête (copies des entrées du catalogue)"""
+        return [dict(self.courses[course_id])
+                for course_id in self.top(self.scores(profile, interests, career_goal), limit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IntelliPath - Plongements précalculés du catalogue de cours")
+    parser.add_argument("--catalog", type=str, default=COURSE_CATALOG_PATH,
+                        help="Catalogue .jsonl, .csv ou .db (défaut: INTELLIPATH_COURSE_CATALOG, sinon prédéfini)")
+    parser.add_argument("--output", type=str, default=COURSE_EMBEDDINGS_PATH,
+                        help="Matrice .npy (défaut: INTELLIPATH_COURSE_EMBEDDINGS)")
+    parser.add_argument("--model", type=str, default=EMBEDDING_MODEL,
+                        help=f"Modèle SentenceTransformer, ou {HASHING_MODEL} (défaut: INTELLIPATH_EMBEDDING_MODEL)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Cours plongés par lot")
+    args = parser.parse_args()
+
+    courses = load_catalog(args.catalog) if args.catalog else CourseCatalog.from_courses(PREDEFINED_COURSES)
+    metadata = embed_catalog(courses, args.output, get_embedder(args.model), args.batch_size)
+    print(json.dumps(metadata, indent=2))
+
+
+if __name__ == "__main__":
+    main()
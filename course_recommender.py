@@ -1,47 +1,42 @@
 # Ajout dans un nouveau fichier: course_recommender.py
-from langchain_ollama import OllamaLLM
-from langchain.prompts import PromptTemplate
+import copy
 import json
-import sqlite3
-import pandas as pd
+
+from course_catalog import RECOMMENDATION_CACHE_ENTRIES
+from progress_queries import get_user_profile
+from text_normalization import normalize_interests, normalize_keyword
+from ttl_cache import TTLCache
 
 class CourseRecommender:
     def __init__(self, progress_tracker):
-        self.llm = OllamaLLM(model="llama3", temperature=0.3)
+        self._llm = None
         self.progress_tracker = progress_tracker
+        # Génération conservée tant que le profil et la requête normalisée sont inchangés
+        self._recommendations = TTLCache(maxsize=RECOMMENDATION_CACHE_ENTRIES, ttl=float("inf"))
+
+    @property
+    def llm(self):
+        """Modèle créé à la première recommandation (langchain importé seulement alors)"""
+        if self._llm is None:
+            from langchain_ollama import OllamaLLM
+            self._llm = OllamaLLM(model="llama3", temperature=0.3)
+        return self._llm
         
     def get_user_profile(self, user_id):
         """Récupère le profil de l'utilisateur à partir du tracker de progression"""
-        conn = sqlite3.connect(self.progress_tracker.db_path)
-        
-        # Obtenir les points forts (compétences avec niveau élevé)
-        strengths_df = pd.read_sql('''
-        SELECT skill_name FROM skills 
-        WHERE user_id = ? AND proficiency_level >= 4
-        ''', conn, params=(user_id,))
-        
-        # Obtenir les points faibles (compétences avec niveau bas)
-        weaknesses_df = pd.read_sql('''
-        SELECT skill_name FROM skills 
-        WHERE user_id = ? AND proficiency_level <= 2
-        ''', conn, params=(user_id,))
-        
-        # Obtenir les sujets déjà étudiés
-        studied_topics_df = pd.read_sql('''
-        SELECT DISTINCT topic FROM study_sessions 
-        WHERE user_id = ?
-        ''', conn, params=(user_id,))
-        
-        conn.close()
-        
-        return {
-            "strengths": strengths_df['skill_name'].tolist() if not strengths_df.empty else [],
-            "weaknesses": weaknesses_df['skill_name'].tolist() if not weaknesses_df.empty else [],
-            "studied_topics": studied_topics_df['topic'].tolist() if not studied_topics_df.empty else []
-        }
+        return get_user_profile(self.progress_tracker.db_path, user_id)
     
     def recommend_courses(self, user_id, interests=None, career_goal=None):
         """Recommande des cours basés sur le profil utilisateur et ses intérêts"""
+        key = (user_id, self.progress_tracker.get_profile_version(user_id),
+               tuple(normalize_interests(interests)), normalize_keyword(career_goal))
+        recommendations = self._recommendations.get(key)
+        if recommendations is not None:
+            # Copie: un appelant qui annote ou trie le résultat ne modifie pas l'entrée en cache
+            return copy.deepcopy(recommendations)
+        
+        from langchain.prompts import PromptTemplate
+        
         user_profile = self.get_user_profile(user_id)
         
         prompt = PromptTemplate(
@@ -79,6 +74,7 @@ class CourseRecommender:
         try:
             # Extraction des recommandations du format JSON
             recommendations = json.loads(response)
+            self._recommendations.set(key, copy.deepcopy(recommendations))
             return recommendations
         except json.JSONDecodeError:
             # Fallback si le format JSON n'est pas respecté
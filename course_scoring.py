@@ -0,0 +1,146 @@
+# course_scoring.py
+# Moteur de score TF-IDF du recommandeur hors ligne (INTELLIPATH_RECOMMENDER_ENGINE=tfidf).
+#
+# Les matrices creuses cours x jetons sont construites une fois par catalogue:
+#   - tous les champs (titre, description, compétences), pour les intérêts et
+#     l'objectif de carrière;
+#   - les seules compétences, pour les points faibles;
+#   - les titres (présence), pour la pénalité des sujets déjà étudiés.
+# Chaque mot-clé de la requête devient un vecteur TF-IDF normalisé; les scores
+# de tous les cours sont obtenus par un produit creux limité aux colonnes des
+# jetons de la requête, puis les meilleurs cours sont extraits par argpartition.
+# Nécessite numpy et scipy (requirements-optional.txt).
+import bisect
+import math
+from collections import Counter
+
+from course_catalog import CAREER_WEIGHT, INTEREST_WEIGHT, MIN_PREFIX_LENGTH, STUDIED_PENALTY, WEAKNESS_WEIGHT
+from text_normalization import tokenize
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError as e:
+    raise ImportError("Le moteur de score TF-IDF nécessite numpy et scipy (pip install numpy scipy)") from e
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+class TfidfScorer:
+    def __init__(self, courses):
+        self.courses = courses
+        vocabulary = {}
+        entries = {"all": ([], [], []), "skills": ([], [], []), "title": ([], [], [])}
+
+        def add(name, course_id, tokens):
+            rows, cols, counts = entries[name]
+            for token, count in Counter(tokens).items():
+                rows.append(course_id)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+                counts.append(count)
+
+        for course_id, course in enumerate(courses):
+            title = tokenize(course["title"])
+            skills = [token for skill in course["skills"] for token in tokenize(skill)]
+            add("all", course_id, title + tokenize(course["description"]) + skills)
+            add("skills", course_id, skills)
+            add("title", course_id, title)
+
+        shape = (len(courses), len(vocabulary))
+        matrices = {}
+        for name, (rows, cols, counts) in entries.items():
+            matrices[name] = sparse.csr_matrix((np.asarray(counts, dtype=np.float32), (rows, cols)), shape=shape)
+
+        # idf lissé (sur l'ensemble des champs) et tf sous-linéaire: 1 + log(tf)
+        document_frequency = np.bincount(matrices["all"].indices, minlength=len(vocabulary))
+        self.idf = (np.log((1 + len(courses)) / (1 + document_frequency)) + 1).astype(np.float32)
+        weighted = {}
+        for name in ("all", "skills"):
+            matrix = matrices[name]
+            matrix.data = (1 + np.log(matrix.data)) * self.idf[matrix.indices]
+            weighted[name] = _normalize_rows(matrix).tocsc()
+
+        # CSC: un produit avec un vecteur de requête ne lit que les colonnes de ses jetons
+        self._all = weighted["all"]
+        self._skills = weighted["skills"]
+        self._titles = (matrices["title"] > 0).tocsc()
+        self._vocabulary = vocabulary
+        self._sorted_tokens = sorted(vocabulary)
+
+    def _token_ids(self, token):
+        if len(token) < MIN_PREFIX_LENGTH:
+            return [self._vocabulary[token]] if token in self._vocabulary else []
+        start = bisect.bisect_left(self._sorted_tokens, token)
+        end = bisect.bisect_left(self._sorted_tokens, token + "\uffff")
+        return [self._vocabulary[expanded] for expanded in self._sorted_tokens[start:end]]
+
+    def _query(self, keywords, weight):
+        """Vecteur creux {colonne: poids}: somme des mots-clés normalisés, multipliée par weight"""
+        query = {}
+        for keyword in keywords:
+            terms = {}
+            for token in tokenize(keyword):
+                for column in self._token_ids(token):
+                    terms[column] = terms.get(column, 0.0) + float(self.idf[column])
+            norm = math.sqrt(sum(value * value for value in terms.values()))
+            for column, value in terms.items():
+                query[column] = query.get(column, 0.0) + weight * value / norm
+        return query
+
+    @staticmethod
+    def _product(matrix, query):
+        columns = np.fromiter(query, dtype=np.int64, count=len(query))
+        weights = np.fromiter(query.values(), dtype=np.float32, count=len(query))
+        return matrix[:, columns] @ weights
+
+    def _studied(self, topics):
+        """Masque des cours dont le titre contient tous les jetons d'un sujet déjà étudié"""
+        penalized = np.zeros(len(self.courses), dtype=bool)
+        for topic in topics:
+            tokens = tokenize(topic)
+            hits = np.zeros(len(self.courses), dtype=np.int32)
+            for token in tokens:
+                columns = self._token_ids(token)
+                if columns:
+                    hits[np.unique(self._titles[:, columns].indices)] += 1
+            if tokens:
+                penalized |= hits == len(tokens)
+        return penalized
+
+    def scores(self, profile, interests, career_goal=None):
+        """Scores de tous les cours (tableau NumPy)"""
+        scores = np.zeros(len(self.courses), dtype=np.float32)
+        query = self._query(interests, INTEREST_WEIGHT)
+        for column, value in self._query([career_goal] if career_goal else [], CAREER_WEIGHT).items():
+            query[column] = query.get(column, 0.0) + value
+        if query:
+            scores += self._product(self._all, query)
+        weaknesses = self._query(profile["weaknesses"], WEAKNESS_WEIGHT)
+        if weaknesses:
+            scores += self._product(self._skills, weaknesses)
+        scores[self._studied(profile["studied_topics"])] += STUDIED_PENALTY
+        return scores
+
+    def top(self, scores, limit=5):
+        """Meilleurs cours par argpartition; cours sans correspondance dans l'ordre du catalogue"""
+        selected = []
+        for group in (np.flatnonzero(scores > 0), np.flatnonzero(scores == 0), np.flatnonzero(scores < 0)):
+            remaining = limit - len(selected)
+            if remaining <= 0:
+                break
+            if len(group) > remaining:
+                if scores[group[0]] == 0:
+                    group = group[:remaining]  # déjà dans l'ordre du catalogue
+                else:
+                    group = group[np.argpartition(-scores[group], remaining - 1)[:remaining]]
+            selected += group[np.lexsort((group, -scores[group]))].tolist()
+        return selected
+
+    def recommend(self, profile, interests, career_goal=None, limit=5):
+        """Renvoie les `limit` cours les plus pertinents (copies des entrées du catalogue)"""
+        return [dict(self.courses[course_id])
+                for course_id in self.top(self.scores(profile, interests, career_goal), limit)]
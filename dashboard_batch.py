@@ -0,0 +1,137 @@
+# dashboard_batch.py
+# Génération des tableaux de bord de tous les apprenants (rapports hebdomadaires).
+#
+# La base est d'abord copiée en un instantané cohérent (API de sauvegarde de
+# SQLite): tous les processus de rendu lisent le même état, sans concurrencer
+# les écritures de l'application. Les identifiants sont lus en flux depuis
+# l'instantané et rendus dans un pool de processus; chaque image est écrite de
+# façon atomique. Un manifeste conserve la version des données de chaque
+# utilisateur (avec l'identité de la base et la version du format des
+# graphiques): une exécution incrémentale ignore ceux sans nouvelle activité.
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from analytics_backend import SQLiteAnalytics
+from chart_renderer import dashboard_chart, render_figure
+from dashboard_cache import DASHBOARD_KEY_VERSION, write_atomic
+
+MANIFEST_NAME = "manifest.json"
+# Fréquence d'enregistrement du manifeste (utilisateurs rendus)
+MANIFEST_FLUSH_EVERY = 500
+
+# Utilisateurs ayant une activité, avec la version de leurs données
+_USERS_SQL = '''
+SELECT users.user_id, COALESCE(v.quiz, 0), COALESCE(v.study, 0), COALESCE(v.skills, 0)
+FROM (
+    SELECT user_id FROM quiz_results
+    UNION SELECT user_id FROM study_sessions
+    UNION SELECT user_id FROM skills
+) AS users
+LEFT JOIN data_versions v ON v.user_id = users.user_id
+'''
+
+_worker = {}
+
+
+def _init_worker(snapshot_path, output_dir):
+    _worker["analytics"] = SQLiteAnalytics(snapshot_path)
+    _worker["output_dir"] = output_dir
+
+
+def _render_user(user_id):
+    """Rend et écrit le tableau de bord d'un utilisateur; renvoie (utilisateur, erreur)"""
+    analytics = _worker["analytics"]
+    try:
+        data = render_figure(dashboard_chart(
+            analytics.quiz_percentage_by_topic(user_id),
+            analytics.study_minutes_by_topic(user_id),
+            analytics.skills(user_id),
+        ))
+        write_atomic(os.path.join(_worker["output_dir"], f"{user_id}_dashboard.png"), data)
+        return user_id, None
+    except Exception as e:
+        return user_id, str(e)
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(path, manifest):
+    write_atomic(path, json.dumps(manifest).encode("utf-8"))
+
+
+def _stream_users(snapshot_path, chunk_size=1000):
+    conn = sqlite3.connect(snapshot_path)
+    try:
+        # Une base recréée repart des mêmes versions: l'identité les distingue
+        store_id = conn.execute("SELECT id FROM store_identity").fetchone()[0]
+        cursor = conn.execute(_USERS_SQL)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for user_id, *version in rows:
+                yield user_id, version + [store_id, DASHBOARD_KEY_VERSION]
+    finally:
+        conn.close()
+
+
+def generate_all_dashboards(db_path, output_dir="dashboard", workers=None, incremental=True):
+    """Génère les tableaux de bord de tous les utilisateurs et renvoie un rapport d'exécution"""
+    from progress_tracker import init_schema
+
+    init_schema(db_path)  # s'assurer que le schéma est à jour
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path) if incremental else {}
+    started = time.perf_counter()
+    report = {"users": 0, "rendered": 0, "skipped": 0, "errors": 0, "error_samples": []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Instantané cohérent partagé par tous les processus de rendu
+        snapshot_path = os.path.join(tmp, "snapshot.db")
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(snapshot_path)
+        source.backup(target)
+        target.close()
+        source.close()
+
+        versions = {}
+
+        def pending_users():
+            for user_id, version in _stream_users(snapshot_path):
+                report["users"] += 1
+                path = os.path.join(output_dir, f"{user_id}_dashboard.png")
+                if incremental and manifest.get(user_id) == version and os.path.exists(path):
+                    report["skipped"] += 1
+                    continue
+                versions[user_id] = version
+                yield user_id
+
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(snapshot_path, output_dir)) as pool:
+            for user_id, error in pool.imap_unordered(_render_user, pending_users(), chunksize=16):
+                version = versions.pop(user_id)
+                if error:
+                    report["errors"] += 1
+                    if len(report["error_samples"]) < 3:
+                        report["error_samples"].append(f"{user_id}: {error}")
+                    continue
+                manifest[user_id] = version
+                report["rendered"] += 1
+                if report["rendered"] % MANIFEST_FLUSH_EVERY == 0:
+                    _save_manifest(manifest_path, manifest)
+
+    _save_manifest(manifest_path, manifest)
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 3)
+    report["rendered_per_sec"] = round(report["rendered"] / elapsed, 1) if elapsed > 0 else report["rendered"]
+    return report
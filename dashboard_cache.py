@@ -0,0 +1,135 @@
+# dashboard_cache.py
+# Cache des images de tableau de bord, adressé par le contenu.
+#
+# La clé d'une image est une empreinte de l'utilisateur et de la version de ses
+# données de progression: tant qu'aucune écriture n'a eu lieu, la même image
+# est resservie sans requête ni rendu matplotlib. Les octets PNG sont gardés
+# en mémoire (LRU borné) et sur disque (nombre de fichiers borné).
+#
+# Le cache disque survit aux changements de code et aux remplacements de la
+# base: la clé contient aussi DASHBOARD_KEY_VERSION et, dans la version des
+# données (ProgressTracker.get_dashboard_version), l'identité de la base.
+import hashlib
+import os
+import tempfile
+import threading
+
+from ttl_cache import TTLCache
+
+DASHBOARD_CACHE_DIR = os.environ.get("INTELLIPATH_DASHBOARD_CACHE_DIR", os.path.join("dashboard", "cache"))
+DASHBOARD_MEMORY_ENTRIES = int(os.environ.get("INTELLIPATH_DASHBOARD_MEMORY_ENTRIES", "64"))
+DASHBOARD_DISK_ENTRIES = int(os.environ.get("INTELLIPATH_DASHBOARD_DISK_ENTRIES", "5000"))
+# Part des images conservées par un élagage: le suivant n'a lieu qu'après de nouvelles écritures
+PRUNE_TARGET_RATIO = 0.9
+# À incrémenter quand les spécifications des graphiques (chart_renderer) ou leur rendu changent
+DASHBOARD_KEY_VERSION = 1
+
+
+def dashboard_key(kind, user_id, data_version):
+    """Empreinte d'une image: format des graphiques, type de graphique, utilisateur et version des données"""
+    raw = f"{DASHBOARD_KEY_VERSION}:{kind}:{user_id}:{':'.join(str(part) for part in data_version)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def write_atomic(path, data):
+    """Écrit un fichier via un fichier temporaire unique renommé (pas de lecture partielle)
+
+    Le nom temporaire est propre à chaque appel: plusieurs threads ou processus
+    peuvent écrire le même fichier, le dernier renommage l'emporte.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".",
+                                    suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp crée le fichier en 0600
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class DashboardCache:
+    def __init__(self, cache_dir=DASHBOARD_CACHE_DIR, memory_entries=DASHBOARD_MEMORY_ENTRIES,
+                 disk_entries=DASHBOARD_DISK_ENTRIES):
+        self.cache_dir = cache_dir
+        self.disk_entries = disk_entries
+        # Les clés changent avec les données: aucune expiration n'est nécessaire
+        self._memory = TTLCache(maxsize=memory_entries, ttl=float("inf"))
+        os.makedirs(cache_dir, exist_ok=True)
+        # Nombre d'images sur le disque, compté une fois puis tenu à jour en mémoire
+        # (majoré: une image réécrite est recomptée); le répertoire n'est relu qu'à l'élagage
+        self._disk_count = len(self._png_entries())
+        self._count_lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key):
+        """Renvoie les octets PNG en cache (mémoire puis disque) ou None"""
+        data = self._memory.get(key)
+        if data is not None:
+            return data
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # l'élagage du disque supprime les images les moins récemment servies
+        except FileNotFoundError:
+            return None
+        self._memory.set(key, data)
+        return data
+
+    def set(self, key, data):
+        self._memory.set(key, data)
+        write_atomic(self._path(key), data)
+        with self._count_lock:
+            self._disk_count += 1
+            prune = self._disk_count > self.disk_entries
+            if prune:
+                self._disk_count = int(self.disk_entries * PRUNE_TARGET_RATIO)
+        if prune:
+            self._prune()
+
+    def get_or_render(self, key, render):
+        """Renvoie l'image en cache ou la produit avec render() puis la met en cache"""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.set(key, data)
+        return data
+
+    def _png_entries(self):
+        return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".png")]
+
+    def _prune(self):
+        # Supprimer les images les plus anciennes jusqu'à PRUNE_TARGET_RATIO de la limite du disque;
+        # un seul élagage à la fois, les écrivains concurrents ne l'attendent pas
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            keep = int(self.disk_entries * PRUNE_TARGET_RATIO)
+            entries = []
+            for entry in self._png_entries():
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass  # supprimé par un autre processus
+            entries.sort()
+            for _, path in entries[:max(len(entries) - keep, 0)]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            with self._count_lock:
+                self._disk_count = min(len(entries), keep)
+        finally:
+            self._prune_lock.release()
+
+    def stats(self):
+        return self._memory.stats()
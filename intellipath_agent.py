@@ -199,11 +199,20 @@ def build_intellipath_agent():
     
     return intellipath_agent
 
+_intellipath_agent = None
+
+def get_intellipath_agent():
+    """Compile le graphe de l'agent une seule fois par processus, au premier usage"""
+    global _intellipath_agent
+    if _intellipath_agent is None:
+        _intellipath_agent = build_intellipath_agent()
+    return _intellipath_agent
+
 # Fonction d'utilisation de l'agent
 def use_intellipath_agent(user_input: str, user_id: str = "default_user", 
                           current_topic: str = None, current_syllabus: str = None):
     """Utilise l'agent IntelliPath pour traiter une entrée utilisateur"""
-    agent = build_intellipath_agent()
+    agent = get_intellipath_agent()
     
     initial_state = AgentState(
         user_input=user_input,
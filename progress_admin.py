@@ -0,0 +1,97 @@
+# progress_admin.py
+# Commandes d'administration de la base de progression
+import argparse
+import json
+
+import progress_io
+from analytics_backend import refresh_parquet_snapshot
+from dashboard_batch import generate_all_dashboards
+from progress_tracker import COMPACTION_BATCH_USERS, ProgressTracker, RETENTION_DAYS
+
+
+def compact_command(args):
+    """Compacte l'historique plus ancien que l'horizon de rétention"""
+    tracker = ProgressTracker(db_path=args.db)
+    return tracker.compact_history(horizon_days=args.horizon_days, vacuum=not args.no_vacuum,
+                                   batch_users=args.batch_users)
+
+
+def export_command(args):
+    """Exporte les tables de progression (CSV ou Parquet) par blocs"""
+    if args.table:
+        path = args.output or f"{args.table}.{args.format}"
+        return [progress_io.export_table(args.db, args.table, path, args.format, args.chunk_size)]
+    return progress_io.export_all(args.db, args.output or "export", args.format, args.chunk_size)
+
+
+def import_command(args):
+    """Importe des tables de progression exportées (CSV ou Parquet)"""
+    if args.table:
+        return [progress_io.import_table(args.db, args.table, args.input, args.format,
+                                         args.chunk_size, args.transaction_rows)]
+    return progress_io.import_all(args.db, args.input, args.format, args.chunk_size, args.transaction_rows)
+
+
+def snapshot_command(args):
+    """Rafraîchit l'instantané Parquet lu par le lecteur analytique DuckDB"""
+    return refresh_parquet_snapshot(args.db, args.output, args.chunk_size)
+
+
+def dashboards_command(args):
+    """Génère les tableaux de bord de tous les utilisateurs"""
+    return generate_all_dashboards(args.db, args.output, workers=args.workers, incremental=not args.full)
+
+
+COMMANDS = {
+    "compact": compact_command,
+    "dashboards": dashboards_command,
+    "export": export_command,
+    "import": import_command,
+    "snapshot": snapshot_command,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IntelliPath - Administration de la base de progression")
+    parser.add_argument("--db", type=str, default="user_progress.db", help="Chemin de la base de progression")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compact_parser = subparsers.add_parser("compact", help="Compacter l'historique ancien (une ligne par jour et par sujet)")
+    compact_parser.add_argument("--horizon-days", type=int, default=RETENTION_DAYS,
+                                help=f"Conserver le détail des N derniers jours (défaut: {RETENTION_DAYS})")
+    compact_parser.add_argument("--batch-users", type=int, default=COMPACTION_BATCH_USERS,
+                                help="Utilisateurs compactés par transaction")
+    compact_parser.add_argument("--no-vacuum", action="store_true", help="Ne pas libérer l'espace disque après compactage")
+
+    for name, help_text in (("export", "Exporter la progression en flux"), ("import", "Importer la progression en flux")):
+        io_parser = subparsers.add_parser(name, help=help_text)
+        if name == "export":
+            io_parser.add_argument("--output", type=str, help="Fichier (avec --table) ou répertoire de sortie (défaut: export/)")
+        else:
+            io_parser.add_argument("--input", type=str, required=True, help="Fichier (avec --table) ou répertoire à importer")
+            io_parser.add_argument("--transaction-rows", type=int, default=progress_io.DEFAULT_TRANSACTION_ROWS,
+                                   help="Lignes par transaction")
+        io_parser.add_argument("--table", choices=sorted(progress_io.TABLES), help="Limiter à une seule table")
+        io_parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Format des fichiers")
+        io_parser.add_argument("--chunk-size", type=int, default=progress_io.DEFAULT_CHUNK_SIZE,
+                               help="Lignes lues/écrites par bloc")
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="Exporter l'instantané Parquet des tableaux de bord")
+    snapshot_parser.add_argument("--output", type=str, default="analytics_snapshot",
+                                 help="Répertoire de l'instantané (INTELLIPATH_ANALYTICS_PARQUET_DIR)")
+    snapshot_parser.add_argument("--chunk-size", type=int, default=progress_io.DEFAULT_CHUNK_SIZE,
+                                 help="Lignes écrites par bloc")
+
+    dashboards_parser = subparsers.add_parser("dashboards", help="Générer les tableaux de bord de tous les utilisateurs")
+    dashboards_parser.add_argument("--output", type=str, default="dashboard", help="Répertoire des images")
+    dashboards_parser.add_argument("--workers", type=int, help="Processus de rendu (défaut: nombre de cœurs)")
+    dashboards_parser.add_argument("--full", action="store_true",
+                                   help="Tout régénérer (par défaut: seulement les utilisateurs avec une nouvelle activité)")
+
+    args = parser.parse_args()
+    result = COMMANDS[args.command](args)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# progress_io.py
+# Export et import en flux de la progression des apprenants (CSV ou Parquet).
+#
+# Les lignes sont lues et écrites par blocs de taille fixe: la mémoire utilisée
+# ne dépend pas de la taille des tables. Les imports utilisent executemany dans
+# de grandes transactions et mettent à jour les agrégats quotidiens. Le format
+# Parquet nécessite pyarrow (requirements-optional.txt).
+#
+# L'historique (quiz, sessions) est ajouté tel quel. Les compétences sont
+# fusionnées: une ligne par (utilisateur, compétence), la plus récente selon
+# last_updated l'emporte, qu'elle vienne de la base ou du fichier importé.
+import csv
+import os
+import sqlite3
+import time
+
+import sqlite_store
+
+# Colonnes exportées par table (l'identifiant auto-incrémenté n'est pas exporté)
+TABLES = {
+    "quiz_results": ["user_id", "topic", "score", "max_score", "completion_time", "attempts"],
+    "study_sessions": ["user_id", "topic", "duration_minutes", "session_date", "sessions"],
+    "skills": ["user_id", "skill_name", "proficiency_level", "last_updated"],
+}
+
+# Types Parquet des colonnes (les horodatages restent au format texte de SQLite)
+_PARQUET_TYPES = {
+    "score": "float64",
+    "max_score": "int64",
+    "attempts": "int64",
+    "duration_minutes": "int64",
+    "sessions": "int64",
+    "proficiency_level": "int64",
+}
+
+# Mise à jour des agrégats quotidiens pour les lignes importées (id > ?)
+_ROLLUP_REFRESH = {
+    "quiz_results": '''
+    INSERT INTO quiz_daily_rollup (user_id, day, topic, total_score, total_max_score, attempts)
+    SELECT user_id, date(completion_time), topic, SUM(score), SUM(max_score), SUM(attempts)
+    FROM quiz_results
+    WHERE id > ?
+    GROUP BY user_id, date(completion_time), topic
+    ON CONFLICT (user_id, day, topic) DO UPDATE SET
+        total_score = total_score + excluded.total_score,
+        total_max_score = total_max_score + excluded.total_max_score,
+        attempts = attempts + excluded.attempts
+    ''',
+    "study_sessions": '''
+    INSERT INTO study_daily_rollup (user_id, day, topic, total_minutes, sessions)
+    SELECT user_id, date(session_date), topic, SUM(duration_minutes), SUM(sessions)
+    FROM study_sessions
+    WHERE id > ?
+    GROUP BY user_id, date(session_date), topic
+    ON CONFLICT (user_id, day, topic) DO UPDATE SET
+        total_minutes = total_minutes + excluded.total_minutes,
+        sessions = sessions + excluded.sessions
+    ''',
+}
+
+# Domaine de data_versions invalidé par l'import de chaque table
+_VERSION_DOMAINS = {
+    "quiz_results": "quiz",
+    "study_sessions": "study",
+    "skills": "skills",
+}
+
+# Compétences importées, fusionnées dans skills avant chaque validation
+_SKILLS_STAGING = "temp.skills_import"
+
+# Fusion par (utilisateur, compétence): la ligne importée la plus récente de chaque paire
+# remplace une compétence plus ancienne (ou non datée) et complète celles qui manquent
+_SKILLS_MERGE = [
+    f'''
+    UPDATE skills SET proficiency_level = imported.proficiency_level, last_updated = imported.last_updated
+    FROM (
+        SELECT user_id, skill_name, proficiency_level, MAX(last_updated) AS last_updated
+        FROM {_SKILLS_STAGING}
+        GROUP BY user_id, skill_name
+    ) AS imported
+    WHERE skills.user_id = imported.user_id AND skills.skill_name = imported.skill_name
+      AND (skills.last_updated IS NULL OR imported.last_updated > skills.last_updated)
+    ''',
+    f'''
+    INSERT INTO skills (user_id, skill_name, proficiency_level, last_updated)
+    SELECT user_id, skill_name, proficiency_level, MAX(last_updated)
+    FROM {_SKILLS_STAGING} AS imported
+    WHERE NOT EXISTS (
+        SELECT 1 FROM skills
+        WHERE skills.user_id = imported.user_id AND skills.skill_name = imported.skill_name
+    )
+    GROUP BY user_id, skill_name
+    ''',
+]
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_TRANSACTION_ROWS = 200000
+
+
+def _detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Format non reconnu pour {path} (utilisez .csv ou .parquet)")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Le format Parquet nécessite pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def _check_table(table):
+    if table not in TABLES:
+        raise ValueError(f"Table inconnue: {table} (attendu: {', '.join(TABLES)})")
+    return TABLES[table]
+
+
+def _report(table, rows, started):
+    elapsed = time.perf_counter() - started
+    return {
+        "table": table,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed) if elapsed > 0 else rows,
+    }
+
+
+def export_table(db_path, table, path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Exporte une table vers un fichier CSV ou Parquet, bloc par bloc"""
+    from progress_tracker import init_schema
+
+    columns = _check_table(table)
+    fmt = _detect_format(path, fmt)
+    init_schema(db_path)  # s'assurer que le schéma est à jour
+    started = time.perf_counter()
+    rows = 0
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+
+        if fmt == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                while True:
+                    chunk = cursor.fetchmany(chunk_size)
+                    if not chunk:
+                        break
+                    writer.writerows(chunk)
+                    rows += len(chunk)
+        else:
+            pa, pq = _import_pyarrow()
+            schema = pa.schema([(column, _PARQUET_TYPES.get(column, "string")) for column in columns])
+            with pq.ParquetWriter(path, schema) as writer:
+                while True:
+                    chunk = cursor.fetchmany(chunk_size)
+                    if not chunk:
+                        break
+                    arrays = [
+                        pa.array([None if value is None else str(value) for value in values], type=field.type)
+                        if pa.types.is_string(field.type) else pa.array(values, type=field.type)
+                        for field, values in zip(schema, zip(*chunk))
+                    ]
+                    writer.write_batch(pa.record_batch(arrays, schema=schema))
+                    rows += len(chunk)
+    finally:
+        conn.close()
+
+    return _report(table, rows, started)
+
+
+def _read_chunks(path, fmt, columns, chunk_size):
+    """Itère sur les lignes d'un fichier exporté par blocs de `chunk_size`"""
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            if header != columns:
+                raise ValueError(f"Colonnes inattendues dans {path}: {header}")
+            chunk = []
+            for row in reader:
+                chunk.append([None if value == "" else value for value in row])
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    else:
+        _, pq = _import_pyarrow()
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield list(zip(*(batch.column(i).to_pylist() for i in range(batch.num_columns))))
+
+
+def _merge_skills(conn):
+    """Fusionne les compétences importées dans skills et invalide les caches de leurs utilisateurs"""
+    for statement in _SKILLS_MERGE:
+        conn.execute(statement)
+    conn.execute(f'''
+    INSERT INTO data_versions (user_id, skills)
+    SELECT DISTINCT user_id, 1 FROM {_SKILLS_STAGING} WHERE true
+    ON CONFLICT (user_id) DO UPDATE SET skills = skills + 1
+    ''')
+    conn.execute(f"DELETE FROM {_SKILLS_STAGING}")
+
+
+def _refresh_derived(conn, table, last_id):
+    """Met à jour agrégats et versions de données pour les lignes importées (id > last_id)"""
+    if table == "skills":
+        _merge_skills(conn)
+        return
+    if table in _ROLLUP_REFRESH:
+        conn.execute(_ROLLUP_REFRESH[table], (last_id,))
+    domain = _VERSION_DOMAINS[table]
+    conn.execute(f'''
+    INSERT INTO data_versions (user_id, {domain})
+    SELECT DISTINCT user_id, 1 FROM {table} WHERE id > ?
+    ON CONFLICT (user_id) DO UPDATE SET {domain} = {domain} + 1
+    ''', (last_id,))
+
+
+def import_table(db_path, table, path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 transaction_rows=DEFAULT_TRANSACTION_ROWS):
+    """Importe un fichier CSV ou Parquet dans une table, par lots executemany
+
+    Les quiz et sessions d'étude sont ajoutés à l'historique existant. Les
+    compétences passent par une table temporaire puis sont fusionnées: pour
+    chaque (utilisateur, compétence), la ligne la plus récente (last_updated)
+    est conservée, sans doublon, et réimporter un même export ne change rien.
+    """
+    from progress_tracker import init_schema
+
+    columns = _check_table(table)
+    fmt = _detect_format(path, fmt)
+    init_schema(db_path)  # s'assurer que le schéma existe
+
+    started = time.perf_counter()
+    rows = 0
+    target = _SKILLS_STAGING if table == "skills" else table
+    insert_sql = f"INSERT INTO {target} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    conn = sqlite_store.connect(db_path)
+    try:
+        if table == "skills":
+            conn.execute(f"CREATE TABLE {_SKILLS_STAGING} ({', '.join(columns)})")
+        # Lire le dernier identifiant sous le verrou d'écriture: les lignes des
+        # autres processus ne sont pas recomptées dans les agrégats
+        pending = 0
+        conn.execute("BEGIN IMMEDIATE")
+        last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        for chunk in _read_chunks(path, fmt, columns, chunk_size):
+            conn.executemany(insert_sql, chunk)
+            rows += len(chunk)
+            pending += len(chunk)
+            if pending >= transaction_rows:
+                _refresh_derived(conn, table, last_id)
+                conn.execute("COMMIT")
+                conn.execute("BEGIN IMMEDIATE")
+                last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+                pending = 0
+        _refresh_derived(conn, table, last_id)
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    return _report(table, rows, started)
+
+
+def export_all(db_path, out_dir, fmt="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Exporte toutes les tables de progression dans un répertoire"""
+    os.makedirs(out_dir, exist_ok=True)
+    return [
+        export_table(db_path, table, os.path.join(out_dir, f"{table}.{fmt}"), fmt, chunk_size)
+        for table in TABLES
+    ]
+
+
+def import_all(db_path, in_dir, fmt="csv", chunk_size=DEFAULT_CHUNK_SIZE,
+               transaction_rows=DEFAULT_TRANSACTION_ROWS):
+    """Importe les fichiers d'un répertoire produit par export_all"""
+    return [
+        import_table(db_path, table, os.path.join(in_dir, f"{table}.{fmt}"), fmt, chunk_size, transaction_rows)
+        for table in TABLES
+        if os.path.exists(os.path.join(in_dir, f"{table}.{fmt}"))
+    ]
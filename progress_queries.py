@@ -0,0 +1,299 @@
+# progress_queries.py
+# Requêtes de lecture de la base de progression.
+#
+# Toutes les requêtes sont des instructions nommées et paramétrées (aucune
+# valeur interpolée dans le SQL): le texte SQL est identique pour tous les
+# utilisateurs, ce qui permet au cache d'instructions de sqlite3 de réutiliser
+# les instructions préparées. Elles sont exécutées sur des connexions
+# persistantes empruntées à un pool du processus (par base): Streamlit lance
+# un nouveau thread à presque chaque réexécution du script, une connexion par
+# thread repartirait d'un cache d'instructions vide à chaque interaction.
+#
+# `python benchmark.py statements` (Python 3.11, SQLite 3.40, un cœur Xeon
+# virtualisé, 500 utilisateurs distincts par passe, meilleure de 3 passes):
+# 8 à 9 µs par requête au texte interpolé contre 3 à 3,5 µs paramétrée, sur
+# la même connexion. Les valeurs absolues varient avec la charge de la machine
+# (jusqu'à 14 et 6 µs), le rapport reste de 2,5 à 3.
+#
+# Les résultats sont des tuples/listes Python; pandas n'est importé que
+# lorsqu'un DataFrame est réellement nécessaire (tableaux et graphiques).
+import os
+import threading
+from contextlib import contextmanager
+
+import sqlite_store
+
+# Taille du cache d'instructions préparées de chaque connexion
+STATEMENT_CACHE_SIZE = 256
+# Connexions inactives conservées par base (au-delà, les connexions rendues sont fermées)
+READ_POOL_SIZE = int(os.environ.get("INTELLIPATH_READ_POOL_SIZE", "8"))
+
+# Agrégats temporels calculés par SQLite à partir des tables *_daily_rollup:
+# le volume transféré dépend du nombre de périodes, pas du nombre de sessions.
+_PERIODS = {
+    "day": "day",
+    "week": "date(day, '-6 days', 'weekday 1')",  # lundi de la semaine
+    "month": "strftime('%Y-%m', day)",
+}
+
+QUERIES = {
+    # Profil utilisateur
+    "skills_strengths": '''
+    SELECT skill_name FROM skills
+    WHERE user_id = ? AND proficiency_level >= 4
+    ''',
+    "skills_weaknesses": '''
+    SELECT skill_name FROM skills
+    WHERE user_id = ? AND proficiency_level <= 2
+    ''',
+    "studied_topics": '''
+    SELECT DISTINCT topic FROM study_sessions
+    WHERE user_id = ?
+    ''',
+    "skill_names": '''
+    SELECT skill_name FROM skills
+    WHERE user_id = ?
+    ''',
+
+    # Version des données (clé des caches de tableaux de bord)
+    "data_version": "SELECT quiz, study, skills FROM data_versions WHERE user_id = ?",
+    "store_id": "SELECT id FROM store_identity",
+
+    # Statistiques de la page d'accueil (agrégats: inchangés par le compactage)
+    "quiz_count": "SELECT SUM(attempts) FROM quiz_daily_rollup WHERE user_id = ?",
+    "study_minutes_total": "SELECT SUM(total_minutes) FROM study_daily_rollup WHERE user_id = ?",
+    "skills_count": "SELECT COUNT(*) FROM skills WHERE user_id = ?",
+
+    # Historiques détaillés
+    "quiz_history_recent": '''
+    SELECT topic, score, max_score,
+           score * 100.0 / max_score AS score_percentage,
+           strftime('%d/%m/%Y %H:%M', completion_time) AS date
+    FROM quiz_results
+    WHERE user_id = ?
+    ORDER BY completion_time DESC
+    LIMIT ?
+    ''',
+    "study_history_recent": '''
+    SELECT topic, duration_minutes,
+           strftime('%d/%m/%Y %H:%M', session_date) AS date
+    FROM study_sessions
+    WHERE user_id = ?
+    ORDER BY session_date DESC
+    LIMIT ?
+    ''',
+    "skills_detail": '''
+    SELECT skill_name, proficiency_level, last_updated
+    FROM skills
+    WHERE user_id = ?
+    ORDER BY proficiency_level DESC
+    ''',
+
+    # Tableau de bord
+    "dashboard_skills": '''
+    SELECT skill_name, proficiency_level
+    FROM skills
+    WHERE user_id = ?
+    ''',
+
+    # Agrégats
+    "study_minutes_by_topic": '''
+    SELECT topic, SUM(total_minutes) AS minutes
+    FROM study_daily_rollup
+    WHERE user_id = ?
+    GROUP BY topic
+    ORDER BY minutes DESC
+    ''',
+    "quiz_percentage_by_topic": '''
+    SELECT topic, SUM(total_score) * 100.0 / SUM(total_max_score), SUM(attempts)
+    FROM quiz_daily_rollup
+    WHERE user_id = ?
+    GROUP BY topic
+    ORDER BY topic
+    ''',
+    # Moyenne des pourcentages de chaque quiz (historique brut): un quiz compte autant
+    # quel que soit son barème. Une ligne compactée compte pour ses `attempts` quiz,
+    # au pourcentage de leurs totaux du jour
+    "quiz_mean_percentage_by_topic": '''
+    SELECT topic, SUM(score * 100.0 / NULLIF(max_score, 0) * attempts) / SUM(attempts), SUM(attempts)
+    FROM quiz_results
+    WHERE user_id = ?
+    GROUP BY topic
+    ORDER BY topic
+    ''',
+    "quiz_summary": '''
+    SELECT COALESCE(SUM(attempts), 0), COALESCE(SUM(total_score), 0), COALESCE(SUM(total_max_score), 0)
+    FROM quiz_daily_rollup
+    WHERE user_id = ?
+    ''',
+    "study_summary": '''
+    SELECT COALESCE(SUM(total_minutes), 0), COALESCE(SUM(sessions), 0)
+    FROM study_daily_rollup
+    WHERE user_id = ?
+    ''',
+
+    # Agrégats de cohorte (tous les utilisateurs)
+    "cohort_topic_stats": '''
+    WITH quiz AS (
+        SELECT topic, COUNT(DISTINCT user_id) AS learners,
+               SUM(total_score) * 100.0 / SUM(total_max_score) AS percentage
+        FROM quiz_daily_rollup GROUP BY topic
+    ), study AS (
+        SELECT topic, SUM(total_minutes) AS minutes FROM study_daily_rollup GROUP BY topic
+    )
+    SELECT quiz.topic, quiz.learners, quiz.percentage, COALESCE(study.minutes, 0)
+    FROM quiz LEFT JOIN study ON quiz.topic IS study.topic
+    ORDER BY quiz.topic
+    ''',
+}
+
+for _period, _bucket in _PERIODS.items():
+    QUERIES[f"study_minutes_by_{_period}"] = f'''
+    SELECT {_bucket} AS bucket, SUM(total_minutes), SUM(sessions)
+    FROM study_daily_rollup
+    WHERE user_id = ?
+    GROUP BY bucket
+    ORDER BY bucket
+    '''
+    QUERIES[f"quiz_percentage_by_{_period}"] = f'''
+    SELECT {_bucket} AS bucket, SUM(total_score) * 100.0 / SUM(total_max_score), SUM(attempts)
+    FROM quiz_daily_rollup
+    WHERE user_id = ?
+    GROUP BY bucket
+    ORDER BY bucket
+    '''
+
+_pools = {}  # base -> connexions inactives (la dernière rendue est la prochaine prêtée)
+_pools_lock = threading.Lock()
+
+
+@contextmanager
+def pooled_connection(db_path):
+    """Prête une connexion persistante du pool du processus, utilisée par un seul thread à la fois"""
+    with _pools_lock:
+        idle = _pools.setdefault(db_path, [])
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = sqlite_store.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+    try:
+        yield conn
+    finally:
+        with _pools_lock:
+            idle = _pools.setdefault(db_path, [])
+            if len(idle) < READ_POOL_SIZE:
+                idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def close_connections():
+    """Ferme les connexions inactives du pool (toutes les bases)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for idle in pools:
+        for conn in idle:
+            conn.close()
+
+
+def _sql(name):
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise ValueError(f"Requête inconnue: {name}") from None
+
+
+def fetch_scalar(db_path, name, params=(), default=None):
+    """Exécute une requête nommée et renvoie la première colonne de la première ligne"""
+    with pooled_connection(db_path) as conn:
+        cursor = conn.execute(_sql(name), params)
+        row = cursor.fetchone()
+        cursor.close()
+    if row is None or row[0] is None:
+        return default
+    return row[0]
+
+
+def fetch_column(db_path, name, params=()):
+    """Exécute une requête nommée et renvoie la première colonne sous forme de liste"""
+    with pooled_connection(db_path) as conn:
+        return [row[0] for row in conn.execute(_sql(name), params)]
+
+
+def fetch_rows(db_path, name, params=()):
+    """Exécute une requête nommée et renvoie toutes les lignes sous forme de tuples"""
+    with pooled_connection(db_path) as conn:
+        return conn.execute(_sql(name), params).fetchall()
+
+
+def read_frame(db_path, name, params=()):
+    """Exécute une requête nommée et renvoie un DataFrame (pandas importé à la demande)"""
+    import pandas as pd
+
+    with pooled_connection(db_path) as conn:
+        return pd.read_sql(_sql(name), conn, params=params)
+
+
+def get_user_profile(db_path, user_id):
+    """Récupère points forts, points faibles et sujets étudiés d'un utilisateur"""
+    return {
+        "strengths": fetch_column(db_path, "skills_strengths", (user_id,)),
+        "weaknesses": fetch_column(db_path, "skills_weaknesses", (user_id,)),
+        "studied_topics": fetch_column(db_path, "studied_topics", (user_id,))
+    }
+
+
+def get_home_stats(db_path, user_id):
+    """Renvoie (quiz complétés, minutes d'étude, compétences) pour la page d'accueil"""
+    return (
+        fetch_scalar(db_path, "quiz_count", (user_id,), default=0),
+        fetch_scalar(db_path, "study_minutes_total", (user_id,), default=0),
+        fetch_scalar(db_path, "skills_count", (user_id,), default=0),
+    )
+
+
+def _check_period(period):
+    if period not in _PERIODS:
+        raise ValueError(f"Période inconnue: {period} (attendu: {', '.join(_PERIODS)})")
+
+
+def study_minutes_by_period(db_path, user_id, period="day"):
+    """Renvoie [(période, minutes, sessions)] triés par période"""
+    _check_period(period)
+    return fetch_rows(db_path, f"study_minutes_by_{period}", (user_id,))
+
+
+def study_minutes_by_topic(db_path, user_id):
+    """Renvoie [(sujet, minutes)] triés par temps décroissant"""
+    return fetch_rows(db_path, "study_minutes_by_topic", (user_id,))
+
+
+def quiz_percentage_by_period(db_path, user_id, period="day"):
+    """Renvoie [(période, pourcentage, tentatives)] triés par période"""
+    _check_period(period)
+    return fetch_rows(db_path, f"quiz_percentage_by_{period}", (user_id,))
+
+
+def quiz_percentage_by_topic(db_path, user_id):
+    """Renvoie [(sujet, pourcentage, tentatives)] par sujet"""
+    return fetch_rows(db_path, "quiz_percentage_by_topic", (user_id,))
+
+
+def quiz_mean_percentage_by_topic(db_path, user_id):
+    """Renvoie [(sujet, moyenne des pourcentages de chaque quiz, tentatives)] par sujet"""
+    return fetch_rows(db_path, "quiz_mean_percentage_by_topic", (user_id,))
+
+
+def get_progress_summary(db_path, user_id):
+    """Renvoie les indicateurs globaux de la page Progression"""
+    quiz_total, score_sum, max_sum = fetch_rows(db_path, "quiz_summary", (user_id,))[0]
+    study_minutes, study_count = fetch_rows(db_path, "study_summary", (user_id,))[0]
+
+    return {
+        "quiz_count": quiz_total,
+        "avg_score": score_sum / max_sum * 100 if max_sum else 0,
+        "study_minutes": study_minutes,
+        "study_sessions": study_count,
+        "avg_session_minutes": study_minutes / study_count if study_count else 0,
+    }
@@ -1,169 +1,468 @@
 # Ajout dans un nouveau fichier: progress_tracker.py
-import sqlite3
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import uuid
+
+from analytics_backend import get_analytics_backend
+from chart_renderer import ChartRenderer, dashboard_chart
+from dashboard_cache import DashboardCache, dashboard_key, write_atomic
+from progress_queries import fetch_rows, fetch_scalar
+from schema_migrations import migrate
+from sqlite_store import connect, run_write
+
+# Horizon de rétention (jours) au-delà duquel l'historique brut est compacté
+RETENTION_DAYS = int(os.environ.get("INTELLIPATH_RETENTION_DAYS", "90"))
+
+# Utilisateurs compactés par transaction: le verrou d'écriture n'est tenu que le temps d'un lot
+COMPACTION_BATCH_USERS = int(os.environ.get("INTELLIPATH_COMPACTION_BATCH_USERS", "200"))
+# Pages rendues par étape de PRAGMA incremental_vacuum (chaque étape prend brièvement le verrou)
+VACUUM_STEP_PAGES = 2000
+
+# Lignes brutes compactées en une ligne par (utilisateur, jour, sujet)
+_COMPACTION = {
+    "study_sessions": {
+        "timestamp": "session_date",
+        "weight": "sessions",
+        "sums": ["duration_minutes"],
+        "domain": "study",
+    },
+    "quiz_results": {
+        "timestamp": "completion_time",
+        "weight": "attempts",
+        "sums": ["score", "max_score"],
+        "domain": "quiz",
+    },
+}
+
+def _create_base_tables(cursor):
+    # Table pour les quiz complétés
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS quiz_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        topic TEXT,
+        score REAL,
+        max_score INTEGER,
+        completion_time TIMESTAMP,
+        attempts INTEGER DEFAULT 1
+    )
+    ''')
+    
+    # Table pour le temps d'étude
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS study_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        topic TEXT,
+        duration_minutes INTEGER,
+        session_date TIMESTAMP,
+        sessions INTEGER DEFAULT 1
+    )
+    ''')
+    
+    # Table pour les compétences acquises
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS skills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        skill_name TEXT,
+        proficiency_level INTEGER,
+        last_updated TIMESTAMP
+    )
+    ''')
+
+def _add_weight_columns(cursor):
+    # Bases antérieures aux versions de schéma: colonnes de pondération des lignes compactées
+    for table, column in (("quiz_results", "attempts"), ("study_sessions", "sessions")):
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER DEFAULT 1")
+
+def _create_history_indexes(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_quiz_results_user_time ON quiz_results (user_id, completion_time)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_study_sessions_user_date ON study_sessions (user_id, session_date)")
+
+def _create_skills_index(cursor):
+    # Recherche d'une compétence par utilisateur (update_skill, fusion des imports)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_skills_user_skill ON skills (user_id, skill_name)")
+
+def _create_store_identity(cursor):
+    # Identité de la base, tirée à sa création: une base recréée ou réimportée, dont les
+    # versions de données repartent de zéro, ne ressert pas les images en cache de l'ancienne
+    cursor.execute("CREATE TABLE IF NOT EXISTS store_identity (id TEXT NOT NULL)")
+    cursor.execute("INSERT INTO store_identity (id) SELECT ? WHERE NOT EXISTS (SELECT 1 FROM store_identity)",
+                   (uuid.uuid4().hex,))
+
+def _rebuild_study_rollup(cursor):
+    cursor.execute("DELETE FROM study_daily_rollup")
+    cursor.execute('''
+    INSERT INTO study_daily_rollup (user_id, day, topic, total_minutes, sessions)
+    SELECT user_id, date(session_date), topic, SUM(duration_minutes), SUM(sessions)
+    FROM study_sessions
+    GROUP BY user_id, date(session_date), topic
+    ''')
+
+def _rebuild_quiz_rollup(cursor):
+    cursor.execute("DELETE FROM quiz_daily_rollup")
+    cursor.execute('''
+    INSERT INTO quiz_daily_rollup (user_id, day, topic, total_score, total_max_score, attempts)
+    SELECT user_id, date(completion_time), topic, SUM(score), SUM(max_score), SUM(attempts)
+    FROM quiz_results
+    GROUP BY user_id, date(completion_time), topic
+    ''')
+
+def _rebuild_rollups(cursor):
+    _rebuild_study_rollup(cursor)
+    _rebuild_quiz_rollup(cursor)
+
+def _create_rollups(cursor):
+    # Agrégats quotidiens, mis à jour à chaque insertion, pour les graphiques
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS study_daily_rollup (
+        user_id TEXT,
+        day TEXT,
+        topic TEXT,
+        total_minutes INTEGER,
+        sessions INTEGER,
+        PRIMARY KEY (user_id, day, topic)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS quiz_daily_rollup (
+        user_id TEXT,
+        day TEXT,
+        topic TEXT,
+        total_score REAL,
+        total_max_score INTEGER,
+        attempts INTEGER,
+        PRIMARY KEY (user_id, day, topic)
+    )
+    ''')
+    
+    # Remplir les agrégats à partir de l'historique existant
+    _rebuild_rollups(cursor)
+
+def _create_data_versions(cursor):
+    # Version des données de chaque utilisateur, incrémentée à chaque écriture (clé des caches)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        user_id TEXT PRIMARY KEY,
+        quiz INTEGER DEFAULT 0,
+        study INTEGER DEFAULT 0,
+        skills INTEGER DEFAULT 0
+    )
+    ''')
+
+# Domaines versionnés de la table data_versions
+DATA_DOMAINS = ("quiz", "study", "skills")
+
+def _bump_data_version(cursor, user_id, domain):
+    cursor.execute(f'''
+    INSERT INTO data_versions (user_id, {domain}) VALUES (?, 1)
+    ON CONFLICT (user_id) DO UPDATE SET {domain} = {domain} + 1
+    ''', (user_id,))
+
+def _compact_batch(cursor, table, spec, cutoff, user_filter, params):
+    """Compacte l'historique d'un lot d'utilisateurs; renvoie le nombre net de lignes supprimées"""
+    ts, weight = spec["timestamp"], spec["weight"]
+    sums = ", ".join(f"SUM({column}) AS {column}" for column in spec["sums"])
+    columns = ", ".join(spec["sums"])
+    
+    # Groupes contenant plusieurs lignes brutes (les groupes déjà compactés sont ignorés)
+    cursor.execute("DROP TABLE IF EXISTS temp.compact_groups")
+    cursor.execute(f'''
+    CREATE TEMP TABLE compact_groups AS
+    SELECT user_id, date({ts}) AS day, topic, {sums},
+           MAX({ts}) AS {ts}, SUM({weight}) AS {weight}
+    FROM {table}
+    WHERE {user_filter} AND {ts} < ?
+    GROUP BY user_id, date({ts}), topic
+    HAVING COUNT(*) > 1
+    ''', (*params, cutoff))
+    cursor.execute("CREATE INDEX temp.idx_compact_groups ON compact_groups (user_id, day, topic)")
+    
+    cursor.execute(f'''
+    DELETE FROM {table}
+    WHERE {user_filter} AND {ts} < ? AND EXISTS (
+        SELECT 1 FROM compact_groups g
+        WHERE g.user_id IS {table}.user_id
+          AND g.day = date({table}.{ts})
+          AND g.topic IS {table}.topic
+    )
+    ''', (*params, cutoff))
+    removed = cursor.rowcount
+    
+    cursor.execute(f'''
+    INSERT INTO {table} (user_id, topic, {columns}, {ts}, {weight})
+    SELECT user_id, topic, {columns}, {ts}, {weight} FROM compact_groups
+    ''')
+    removed -= cursor.rowcount
+    
+    # L'historique détaillé des utilisateurs concernés a changé
+    domain = spec["domain"]
+    cursor.execute(f'''
+    INSERT INTO data_versions (user_id, {domain})
+    SELECT DISTINCT user_id, 1 FROM compact_groups WHERE true
+    ON CONFLICT (user_id) DO UPDATE SET {domain} = {domain} + 1
+    ''')
+    cursor.execute("DROP TABLE temp.compact_groups")
+    return removed
+
+# Migrations ordonnées du schéma (PRAGMA user_version = nombre de migrations appliquées)
+MIGRATIONS = [
+    _create_base_tables,
+    _add_weight_columns,
+    _create_history_indexes,
+    _create_rollups,
+    _create_data_versions,
+    _create_skills_index,
+    _create_store_identity,
+]
+
+def init_schema(db_path):
+    """Applique les migrations de la base de progression (une lecture de PRAGMA si elle est à jour)"""
+    # Plusieurs processus peuvent écrire dans la base: journal WAL (voir sqlite_store)
+    migrate(db_path, MIGRATIONS, initial_pragmas=["auto_vacuum = INCREMENTAL"], journal_mode="WAL")
 
 class ProgressTracker:
     def __init__(self, db_path="user_progress.db"):
         self.db_path = db_path
+        self._analytics = None
+        self._dashboard_cache = None
+        self._chart_renderer = None
         self.init_db()
         
     def init_db(self):
-        """Initialise la base de données"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Table pour les quiz complétés
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS quiz_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            topic TEXT,
-            score REAL,
-            max_score INTEGER,
-            completion_time TIMESTAMP
-        )
-        ''')
-        
-        # Table pour le temps d'étude
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS study_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            topic TEXT,
-            duration_minutes INTEGER,
-            session_date TIMESTAMP
-        )
-        ''')
-        
-        # Table pour les compétences acquises
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS skills (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            skill_name TEXT,
-            proficiency_level INTEGER,
-            last_updated TIMESTAMP
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Initialise la base de données (migrations appliquées une seule fois)"""
+        init_schema(self.db_path)
+        
+    def rebuild_rollups(self):
+        """Reconstruit les agrégats quotidiens à partir de l'historique brut (une transaction par table)"""
+        run_write(self.db_path, _rebuild_study_rollup)
+        run_write(self.db_path, _rebuild_quiz_rollup)
         
     def record_quiz_result(self, user_id, topic, score, max_score):
         """Enregistre les résultats d'un quiz"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO quiz_results (user_id, topic, score, max_score, completion_time)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, topic, score, max_score, datetime.now()))
-        
-        conn.commit()
-        conn.close()
+        now = datetime.now()
+
+        def write(cursor):
+            cursor.execute('''
+            INSERT INTO quiz_results (user_id, topic, score, max_score, completion_time)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, topic, score, max_score, now))
+
+            cursor.execute('''
+            INSERT INTO quiz_daily_rollup (user_id, day, topic, total_score, total_max_score, attempts)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (user_id, day, topic) DO UPDATE SET
+                total_score = total_score + excluded.total_score,
+                total_max_score = total_max_score + excluded.total_max_score,
+                attempts = attempts + 1
+            ''', (user_id, now.date().isoformat(), topic, score, max_score))
+
+            _bump_data_version(cursor, user_id, "quiz")
+
+        run_write(self.db_path, write)
         
     def record_study_session(self, user_id, topic, duration_minutes):
         """Enregistre une session d'étude"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO study_sessions (user_id, topic, duration_minutes, session_date)
-        VALUES (?, ?, ?, ?)
-        ''', (user_id, topic, duration_minutes, datetime.now()))
-        
-        conn.commit()
-        conn.close()
+        now = datetime.now()
+
+        def write(cursor):
+            cursor.execute('''
+            INSERT INTO study_sessions (user_id, topic, duration_minutes, session_date)
+            VALUES (?, ?, ?, ?)
+            ''', (user_id, topic, duration_minutes, now))
+
+            cursor.execute('''
+            INSERT INTO study_daily_rollup (user_id, day, topic, total_minutes, sessions)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (user_id, day, topic) DO UPDATE SET
+                total_minutes = total_minutes + excluded.total_minutes,
+                sessions = sessions + 1
+            ''', (user_id, now.date().isoformat(), topic, duration_minutes))
+
+            _bump_data_version(cursor, user_id, "study")
+
+        run_write(self.db_path, write)
         
     def update_skill(self, user_id, skill_name, proficiency_level):
         """Met à jour ou ajoute une compétence"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        def write(cursor):
+            # Vérifier si la compétence existe déjà
+            cursor.execute('''
+            SELECT id FROM skills WHERE user_id = ? AND skill_name = ?
+            ''', (user_id, skill_name))
+            
+            skill = cursor.fetchone()
+            
+            if skill:
+                cursor.execute('''
+                UPDATE skills SET proficiency_level = ?, last_updated = ? WHERE id = ?
+                ''', (proficiency_level, datetime.now(), skill[0]))
+            else:
+                cursor.execute('''
+                INSERT INTO skills (user_id, skill_name, proficiency_level, last_updated)
+                VALUES (?, ?, ?, ?)
+                ''', (user_id, skill_name, proficiency_level, datetime.now()))
+            
+            _bump_data_version(cursor, user_id, "skills")
         
-        # Vérifier si la compétence existe déjà
-        cursor.execute('''
-        SELECT id FROM skills WHERE user_id = ? AND skill_name = ?
-        ''', (user_id, skill_name))
+        run_write(self.db_path, write)
         
-        skill = cursor.fetchone()
+    def compact_history(self, horizon_days=None, vacuum=True, batch_users=COMPACTION_BATCH_USERS):
+        """Regroupe l'historique brut plus ancien que l'horizon en une ligne par jour et par sujet
         
-        if skill:
-            cursor.execute('''
-            UPDATE skills SET proficiency_level = ?, last_updated = ? WHERE id = ?
-            ''', (proficiency_level, datetime.now(), skill[0]))
-        else:
-            cursor.execute('''
-            INSERT INTO skills (user_id, skill_name, proficiency_level, last_updated)
-            VALUES (?, ?, ?, ?)
-            ''', (user_id, skill_name, proficiency_level, datetime.now()))
+        Les totaux (minutes, scores, nombre de quiz et de sessions) sont conservés
+        grâce aux colonnes de pondération `sessions` et `attempts`. Chaque table
+        est traitée par lots de `batch_users` utilisateurs, chacun dans sa propre
+        transaction (run_write): les écritures de l'application s'intercalent
+        entre les lots. Renvoie le nombre de lignes supprimées par table, le
+        nombre de lots et les pages libérées.
+        """
+        horizon_days = RETENTION_DAYS if horizon_days is None else horizon_days
+        cutoff = (datetime.now() - timedelta(days=horizon_days)).date().isoformat()
+        stats = {"cutoff": cutoff, "batches": 0}
         
-        conn.commit()
-        conn.close()
+        for table, spec in _COMPACTION.items():
+            stats[table] = 0
+            for user_filter, params in self._compaction_batches(table, spec["timestamp"], cutoff, batch_users):
+                stats[table] += run_write(self.db_path, lambda cursor: _compact_batch(
+                    cursor, table, spec, cutoff, user_filter, params
+                ))
+                stats["batches"] += 1
         
+        if vacuum:
+            stats["freed_pages"] = self._vacuum()
+        return stats
+    
+    def _compaction_batches(self, table, ts, cutoff, batch_users):
+        """Lots d'utilisateurs ayant de l'historique avant la date limite: (filtre SQL, paramètres)"""
+        conn = connect(self.db_path)
+        try:
+            last_user = None
+            while True:
+                # Pagination par clé sur l'index (user_id, horodatage)
+                user_ids = [row[0] for row in conn.execute(f'''
+                SELECT DISTINCT user_id FROM {table}
+                WHERE user_id IS NOT NULL AND (? IS NULL OR user_id > ?) AND {ts} < ?
+                ORDER BY user_id LIMIT ?
+                ''', (last_user, last_user, cutoff, batch_users))]
+                if not user_ids:
+                    break
+                yield "user_id BETWEEN ? AND ?", (user_ids[0], user_ids[-1])
+                last_user = user_ids[-1]
+            
+            if conn.execute(f"SELECT 1 FROM {table} WHERE user_id IS NULL AND {ts} < ? LIMIT 1", (cutoff,)).fetchone():
+                yield "user_id IS NULL", ()
+        finally:
+            conn.close()
+    
+    def _vacuum(self):
+        """Rend les pages libres au système, hors des transactions de compactage; renvoie leur nombre"""
+        conn = connect(self.db_path)
+        try:
+            # Convertir une fois les bases créées sans auto_vacuum (VACUUM complet, verrou exclusif)
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            freed_pages = remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # Par étapes bornées: chacune est une courte transaction d'écriture
+            while remaining:
+                conn.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+                left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if left >= remaining:
+                    break  # plus aucune page rendue (base sans auto_vacuum incrémental)
+                remaining = left
+            return freed_pages
+        finally:
+            conn.close()
+    
+    def get_analytics(self):
+        """Renvoie le lecteur analytique configuré pour les tableaux de bord"""
+        if self._analytics is None:
+            self._analytics = get_analytics_backend(self.db_path)
+        return self._analytics
+    
+    def get_data_version(self, user_id):
+        """Renvoie la version (quiz, étude, compétences) des données de l'utilisateur"""
+        rows = fetch_rows(self.db_path, "data_version", (user_id,))
+        return rows[0] if rows else (0,) * len(DATA_DOMAINS)
+    
+    def get_profile_version(self, user_id):
+        """Version des données lues par get_user_profile (sessions d'étude, compétences)
+        
+        Incrémentée dans la transaction de chaque écriture: une clé de cache qui
+        la contient ne peut pas resservir un profil périmé.
+        """
+        _, study, skills = self.get_data_version(user_id)
+        return study, skills
+    
+    def get_store_id(self):
+        """Identité de la base, lue à chaque appel: le fichier peut être remplacé (restauration)"""
+        return fetch_scalar(self.db_path, "store_id")
+    
+    def get_dashboard_version(self, user_id):
+        """Version des agrégats des tableaux de bord: données de l'utilisateur, génération du lecteur
+        analytique et identité de la base
+        
+        Avec un instantané Parquet, les agrégats changent au rafraîchissement de
+        l'instantané et non à l'écriture: la génération entre dans les clés de cache.
+        """
+        return tuple(self.get_data_version(user_id)) + (self.get_analytics().generation(), self.get_store_id())
+    
+    def get_dashboard_cache(self):
+        if self._dashboard_cache is None:
+            self._dashboard_cache = DashboardCache()
+        return self._dashboard_cache
+    
+    def get_chart_renderer(self):
+        """Renvoie le moteur de rendu (pool de processus) associé au cache des tableaux de bord"""
+        if self._chart_renderer is None:
+            self._chart_renderer = ChartRenderer(cache=self.get_dashboard_cache())
+        return self._chart_renderer
+    
+    def get_dashboard_png(self, user_id, renderer=None):
+        """Renvoie le tableau de bord en PNG, redessiné seulement si les données ont changé
+        
+        Le rendu passe par `renderer` (par défaut celui du tracker): l'application
+        fournit le sien pour partager son pool de processus et son cache.
+        """
+        renderer = renderer or self.get_chart_renderer()
+        version = self.get_dashboard_version(user_id)
+        data = renderer.cache.get(dashboard_key("dashboard", user_id, version))
+        if data is None:
+            data = renderer.render_charts(user_id, version, {"dashboard": self.dashboard_spec(user_id)})["dashboard"]
+        return data
+    
     def generate_dashboard(self, user_id, output_dir="dashboard"):
         """Génère un tableau de bord graphique pour l'utilisateur"""
         os.makedirs(output_dir, exist_ok=True)
+        path = f"{output_dir}/{user_id}_dashboard.png"
+        
+        data = self.get_dashboard_png(user_id)
+        
+        # Ne réécrire le fichier que si l'image a changé
+        try:
+            with open(path, "rb") as f:
+                unchanged = f.read() == data
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            write_atomic(path, data)
         
-        conn = sqlite3.connect(self.db_path)
-        
-        # Récupérer les données des quiz
-        quiz_df = pd.read_sql('''
-        SELECT topic, AVG(score/max_score)*100 as percentage, 
-               COUNT(*) as attempts
-        FROM quiz_results 
-        WHERE user_id = ? 
-        GROUP BY topic
-        ''', conn, params=(user_id,))
-        
-        # Récupérer les données de temps d'étude
-        study_df = pd.read_sql('''
-        SELECT topic, SUM(duration_minutes) as total_minutes
-        FROM study_sessions 
-        WHERE user_id = ? 
-        GROUP BY topic
-        ''', conn, params=(user_id,))
-        
-        # Récupérer les compétences
-        skills_df = pd.read_sql('''
-        SELECT skill_name, proficiency_level
-        FROM skills 
-        WHERE user_id = ?
-        ''', conn, params=(user_id,))
-        
-        conn.close()
-        
-        # Créer les visualisations
-        plt.figure(figsize=(12, 8))
-        
-        # Graphique des performances de quiz
-        if not quiz_df.empty:
-            plt.subplot(2, 2, 1)
-            quiz_df.plot(kind='bar', x='topic', y='percentage', ax=plt.gca())
-            plt.title('Performance par sujet (%)')
-            plt.ylabel('Score moyen (%)')
-            plt.xlabel('Sujet')
-            plt.tight_layout()
-        
-        # Graphique du temps d'étude
-        if not study_df.empty:
-            plt.subplot(2, 2, 2)
-            study_df.plot(kind='pie', y='total_minutes', labels=study_df['topic'], autopct='%1.1f%%', ax=plt.gca())
-            plt.title('Répartition du temps d\'étude')
-            plt.ylabel('')
-        
-        # Graphique des compétences
-        if not skills_df.empty:
-            plt.subplot(2, 2, 3)
-            skills_df.plot(kind='barh', x='skill_name', y='proficiency_level', ax=plt.gca())
-            plt.title('Niveau de compétence')
-            plt.xlabel('Niveau (1-5)')
-            plt.ylabel('Compétence')
-        
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/{user_id}_dashboard.png")
-        plt.close()
-        
-        return f"{output_dir}/{user_id}_dashboard.png"
\ No newline at end of file
+        return path
+    
+    def dashboard_spec(self, user_id):
+        """Spécification du tableau de bord de l'utilisateur (données lues par le lecteur analytique)"""
+        # Récupérer les données des quiz, du temps d'étude et des compétences
+        analytics = self.get_analytics()
+        quiz_by_topic = analytics.quiz_percentage_by_topic(user_id)
+        study_by_topic = analytics.study_minutes_by_topic(user_id)
+        skills = analytics.skills(user_id)
+        return dashboard_chart(quiz_by_topic, study_by_topic, skills)
+    
+    def render_dashboard(self, user_id):
+        """Dessine le tableau de bord de l'utilisateur (pool de rendu, sans cache) et renvoie les octets PNG"""
+        return self.get_chart_renderer().render({"dashboard": self.dashboard_spec(user_id)})["dashboard"]
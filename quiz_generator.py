@@ -14,8 +14,15 @@ class QuizQuestion(BaseModel):
 
 class QuizGenerator:
     def __init__(self):
-        self.llm = OllamaLLM(model="llama3", temperature=0.7)
+        self._llm = None
         self.parser = PydanticOutputParser(pydantic_object=QuizQuestion)
+
+    @property
+    def llm(self):
+        """Modèle créé à la première génération de quiz"""
+        if self._llm is None:
+            self._llm = OllamaLLM(model="llama3", temperature=0.7)
+        return self._llm
         
     def generate_quiz(self, topic, difficulty="moyen", num_questions=5):
         """Génère un quiz sur un sujet donné avec le nombre exact de questions demandé"""
@@ -0,0 +1,57 @@
+# schema_migrations.py
+# Migrations de schéma des bases SQLite, versionnées par PRAGMA user_version.
+#
+# Chaque base déclare une liste ordonnée de migrations (fonctions recevant un
+# curseur). La migration i porte la base à la version i + 1. Une base à jour ne
+# coûte qu'une lecture de PRAGMA user_version au démarrage, sur une seule
+# connexion: le mode de journal (réglage persistant, stocké dans le fichier)
+# n'est fixé que lorsque des migrations s'appliquent. Les migrations
+# s'exécutent dans une transaction BEGIN IMMEDIATE: si plusieurs processus
+# démarrent en même temps, un seul applique les migrations et les autres
+# relisent la version une fois le verrou obtenu.
+import sqlite3
+
+# Attente maximale (secondes) du verrou d'écriture pendant une migration
+MIGRATION_LOCK_TIMEOUT = 30
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path, migrations, initial_pragmas=(), journal_mode=None):
+    """Applique les migrations manquantes et renvoie la version du schéma
+
+    `initial_pragmas` ne s'appliquent qu'à une base neuve (version 0), avant la
+    transaction: certains réglages comme auto_vacuum sont ignorés à l'intérieur
+    d'une transaction. `journal_mode` (par exemple "WAL") est fixé après les
+    migrations, sur la même connexion; une base déjà à jour l'a déjà reçu.
+    """
+    target = len(migrations)
+    conn = sqlite3.connect(db_path, timeout=MIGRATION_LOCK_TIMEOUT, isolation_level=None)
+    try:
+        version = schema_version(conn)
+        if version >= target:
+            return version
+
+        if version == 0:
+            for pragma in initial_pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Un autre processus a pu migrer la base pendant l'attente du verrou
+            version = schema_version(conn)
+            cursor = conn.cursor()
+            for migration in migrations[version:]:
+                migration(cursor)
+            conn.execute(f"PRAGMA user_version = {max(version, target)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+        return max(version, target)
+    finally:
+        conn.close()
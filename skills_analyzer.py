@@ -1,83 +1,140 @@
 # Nouveau fichier: skills_analyzer.py
-from langchain_ollama import OllamaLLM
-import sqlite3
-import pandas as pd
 import json
 
+from progress_queries import fetch_column, quiz_mean_percentage_by_topic
+from text_normalization import normalize_keyword
+from ttl_cache import TTLCache
+
+# Analyses conservées: détaillées (utilisateur, version des résultats de quiz) et
+# écarts de compétences (utilisateur, version des compétences, objectif normalisé)
+ANALYSIS_CACHE_ENTRIES = 1000
+# Durée (secondes) de conservation d'une analyse des écarts dont le JSON n'a pas pu être
+# interprété: resservie aux relances de la page, puis régénérée au prochain clic
+GAP_FALLBACK_TTL = 600
+
 class SkillsAnalyzer:
     def __init__(self, progress_tracker):
-        self.llm = OllamaLLM(model="llama3", temperature=0.2)
+        self._llm = None
         self.progress_tracker = progress_tracker
+        # Les clés changent avec les données analysées: aucune expiration n'est nécessaire
+        self._analyses = TTLCache(maxsize=ANALYSIS_CACHE_ENTRIES, ttl=float("inf"))
+
+    @property
+    def llm(self):
+        """Modèle créé à la première analyse détaillée (page Progression utilisable sans Ollama)"""
+        if self._llm is None:
+            from langchain_ollama import OllamaLLM
+            self._llm = OllamaLLM(model="llama3", temperature=0.2)
+        return self._llm
     
-    def analyze_quiz_performance(self, user_id):
-        """Analyse les performances aux quiz pour identifier les forces et faiblesses"""
-        conn = sqlite3.connect(self.progress_tracker.db_path)
+    def quiz_performance(self, user_id, topic_performance=None):
+        """Forces et faiblesses calculées localement (sans appel au LLM)
+        
+        Le pourcentage d'un sujet est la moyenne des pourcentages de ses quiz,
+        comme avant les agrégats quotidiens (et non le rapport des totaux).
+        """
+        if topic_performance is None:
+            # Récupérer les performances par sujet [(sujet, pourcentage, tentatives)]
+            topic_performance = quiz_mean_percentage_by_topic(self.progress_tracker.db_path, user_id)
+        
+        # Identifier les forces (>75%) et faiblesses (<50%)
+        return {
+            "strengths": [topic for topic, percentage, _ in topic_performance if percentage >= 75],
+            "weaknesses": [topic for topic, percentage, _ in topic_performance if percentage < 50],
+            "topic_performance": list(topic_performance)
+        }
+    
+    def cached_analysis(self, user_id, quiz_version):
+        """Analyse détaillée déjà générée pour cette version des résultats de quiz, ou None"""
+        return self._analyses.get((user_id, quiz_version))
+    
+    def detailed_analysis(self, user_id, quiz_version, refresh=False):
+        """Analyse détaillée par le LLM, mémorisée par (utilisateur, version des résultats de quiz)
+        
+        Un nouveau résultat de quiz change la version: l'analyse précédente n'est
+        plus resservie. refresh=True force une nouvelle génération.
+        """
+        key = (user_id, quiz_version)
+        if not refresh:
+            analysis = self._analyses.get(key)
+            if analysis is not None:
+                return analysis
+        
+        performance = self.quiz_performance(user_id)
+        if not performance["topic_performance"]:
+            return "Pas assez de données pour analyser les performances."
+        
+        performance_table = "\n".join(
+            f"{topic}: {percentage:.1f}% ({attempts} quiz)"
+            for topic, percentage, attempts in performance["topic_performance"]
+        )
+        strengths = performance["strengths"]
+        weaknesses = performance["weaknesses"]
+        
+        # Analyse plus détaillée avec LLM
+        analysis_prompt = f"""
+        Analyse les performances suivantes aux quiz et fournis des recommandations d'amélioration:
         
-        # Récupérer les résultats de quiz
-        quiz_results = pd.read_sql(f"""
-        SELECT topic, score, max_score, completion_time
-        FROM quiz_results
-        WHERE user_id = '{user_id}'
-        ORDER BY completion_time DESC
-        """, conn)
+        {performance_table}
         
-        conn.close()
+        Points forts: {', '.join(strengths) if strengths else 'Aucun identifié'}
+        Points faibles: {', '.join(weaknesses) if weaknesses else 'Aucun identifié'}
+        
+        Fournis:
+        1. Une analyse globale des performances
+        2. Des recommandations spécifiques pour améliorer les points faibles
+        3. Des suggestions pour s'appuyer sur les points forts
+        """
+        
+        analysis = self.llm.invoke(analysis_prompt)
+        self._analyses.set(key, analysis)
+        return analysis
+    
+    def analyze_quiz_performance(self, user_id):
+        """Analyse les performances aux quiz pour identifier les forces et faiblesses"""
+        performance = self.quiz_performance(user_id)
         
-        if quiz_results.empty:
+        if not performance["topic_performance"]:
             return {
                 "strengths": [],
                 "weaknesses": [],
                 "analysis": "Pas assez de données pour analyser les performances."
             }
         
-        # Calculer les performances par sujet
-        quiz_results['percentage'] = quiz_results['score'] / quiz_results['max_score'] * 100
-        topic_performance = quiz_results.groupby('topic')['percentage'].mean().reset_index()
-        
-        # Identifier les forces (>75%) et faiblesses (<50%)
-        strengths = topic_performance[topic_performance['percentage'] >= 75]['topic'].tolist()
-        weaknesses = topic_performance[topic_performance['percentage'] < 50]['topic'].tolist()
-        
-        # Analyse plus détaillée avec LLM
-        if not quiz_results.empty:
-            analysis_prompt = f"""
-            Analyse les performances suivantes aux quiz et fournis des recommandations d'amélioration:
-            
-            {topic_performance.to_string()}
-            
-            Points forts: {', '.join(strengths) if strengths else 'Aucun identifié'}
-            Points faibles: {', '.join(weaknesses) if weaknesses else 'Aucun identifié'}
-            
-            Fournis:
-            1. Une analyse globale des performances
-            2. Des recommandations spécifiques pour améliorer les points faibles
-            3. Des suggestions pour s'appuyer sur les points forts
-            """
-            
-            analysis = self.llm.invoke(analysis_prompt)
-        else:
-            analysis = "Pas assez de données pour une analyse détaillée."
-        
+        quiz_version = self.progress_tracker.get_data_version(user_id)[0]
         return {
-            "strengths": strengths,
-            "weaknesses": weaknesses,
-            "analysis": analysis
+            "strengths": performance["strengths"],
+            "weaknesses": performance["weaknesses"],
+            "analysis": self.detailed_analysis(user_id, quiz_version)
         }
     
-    def skill_gap_analysis(self, user_id, target_career=None):
-        """Analyse les écarts de compétences pour un objectif professionnel donné"""
-        # Récupérer les compétences actuelles
-        conn = sqlite3.connect(self.progress_tracker.db_path)
-        
-        current_skills = pd.read_sql(f"""
-        SELECT skill_name, proficiency_level
-        FROM skills
-        WHERE user_id = '{user_id}'
-        """, conn)
+    def _gap_key(self, user_id, skills_version, target_career):
+        return ("gap", user_id, skills_version, normalize_keyword(target_career))
+    
+    def cached_gap_analysis(self, user_id, skills_version, target_career):
+        """Analyse des écarts déjà générée pour cet objectif et cette version des compétences, ou None"""
+        return self._analyses.get(self._gap_key(user_id, skills_version, target_career))
+    
+    def gap_analysis(self, user_id, skills_version, target_career, refresh=False):
+        """Analyse des écarts par le LLM, mémorisée par (utilisateur, version des compétences, objectif)
         
-        conn.close()
+        Le résultat de repli d'une réponse qui n'a pas pu être interprétée n'est
+        conservé que GAP_FALLBACK_TTL secondes. refresh=True force une nouvelle génération.
+        """
+        key = self._gap_key(user_id, skills_version, target_career)
+        if not refresh:
+            analysis = self._analyses.get(key)
+            if analysis is not None:
+                return analysis
         
-        current_skills_list = current_skills['skill_name'].tolist() if not current_skills.empty else []
+        analysis, parsed = self._generate_gap_analysis(user_id, target_career)
+        self._analyses.set(key, analysis, ttl=None if parsed else GAP_FALLBACK_TTL)
+        return analysis
+    
+    def _generate_gap_analysis(self, user_id, target_career):
+        """Renvoie (analyse, réponse JSON du LLM interprétée)"""
+        # Récupérer les compétences actuelles
+        current_skills_list = fetch_column(self.progress_tracker.db_path, "skill_names", (user_id,))
         
         # Si un objectif de carrière est spécifié, analyser l'écart
         if target_career:
@@ -96,20 +153,22 @@ class SkillsAnalyzer:
             
             try:
                 # Tenter de parser le JSON
-                gap_analysis = json.loads(gap_analysis_text)
+                return json.loads(gap_analysis_text), True
             except json.JSONDecodeError:
                 # En cas d'échec, structurer manuellement la réponse
-                gap_analysis = {
+                return {
                     "required_skills": [],
                     "existing_skills": current_skills_list,
                     "missing_skills": [],
                     "learning_path": "Impossible de générer un parcours d'apprentissage automatiquement."
-                }
-                
-            return gap_analysis
+                }, False
         else:
             return {
                 "existing_skills": current_skills_list,
                 "missing_skills": [],
                 "learning_path": "Veuillez spécifier un objectif professionnel pour une analyse complète."
-            }
\ No newline at end of file
+            }, False
+    
+    def skill_gap_analysis(self, user_id, target_career=None):
+        """Analyse les écarts de compétences pour un objectif professionnel donné"""
+        return self._generate_gap_analysis(user_id, target_career)[0]
@@ -10,55 +10,95 @@ st.set_page_config(
 
 # Import des modules standards
 import time
-import pandas as pd
-import matplotlib.pyplot as plt
+import uuid
 from datetime import datetime
 import os
 import json
-import sqlite3
-import numpy as np
 
 # Importation du gestionnaire d'utilisateurs
 from user_manager import UserManager
+from chart_renderer import (
+    CHART_MODE, ChartRenderer, quiz_history_chart, skills_chart, study_period_chart, summary_chart, vega_lite_spec
+)
+from progress_queries import get_home_stats, read_frame
 
-# Importation sécurisée des modules personnalisés
-def import_modules():
-    from generating_syllabus import generate_syllabus
-    from teaching_agent import teaching_agent
-    from quiz_generator import QuizGenerator
-    from progress_tracker import ProgressTracker
-    from course_recommender_offline import CourseRecommenderOffline
-    from skills_analyzer import SkillsAnalyzer
-    
-    return {
-        "generate_syllabus": generate_syllabus,
-        "teaching_agent": teaching_agent,
-        "QuizGenerator": QuizGenerator,
-        "ProgressTracker": ProgressTracker,
-        "CourseRecommender": CourseRecommenderOffline,
-        "SkillsAnalyzer": SkillsAnalyzer
-    }
+# Nombre maximum de lignes affichées dans les tableaux d'historique
+HISTORY_TABLE_LIMIT = 200
+# Entrées conservées par cache de lectures de progression
+PROGRESS_CACHE_ENTRIES = int(os.environ.get("INTELLIPATH_PROGRESS_CACHE_ENTRIES", "512"))
+# Messages de la conversation affichés (et chargés par "Afficher les messages précédents")
+CHAT_WINDOW = int(os.environ.get("INTELLIPATH_CHAT_WINDOW", "20"))
+
+# Service de rendu des graphiques (pool de processus partagé par les sessions)
+@st.cache_resource
+def initialize_chart_renderer():
+    return ChartRenderer()
+
+chart_renderer = initialize_chart_renderer()
 
 # Initialisation du gestionnaire d'utilisateurs
 @st.cache_resource
 def initialize_user_manager():
-    return UserManager()
+    manager = UserManager()
+    manager.start_session_sweeper()
+    return manager
 
 user_manager = initialize_user_manager()
 
-# Chargement des modules
-modules = import_modules()
+# Initialisation des composants à la demande: la page de connexion n'importe ni
+# langchain ni pandas, et chaque page ne construit que les composants qu'elle
+# utilise (une seule fois par processus grâce à st.cache_resource)
+@st.cache_resource
+def get_progress_tracker():
+    from progress_tracker import ProgressTracker
+    return ProgressTracker(db_path="user_progress.db")
+
+@st.cache_resource
+def get_quiz_generator():
+    from quiz_generator import QuizGenerator
+    return QuizGenerator()
+
+@st.cache_resource
+def get_course_recommender():
+    from course_recommender_offline import CourseRecommenderOffline
+    return CourseRecommenderOffline(get_progress_tracker())
+
+@st.cache_resource
+def get_skills_analyzer():
+    from skills_analyzer import SkillsAnalyzer
+    return SkillsAnalyzer(get_progress_tracker())
 
-# Initialisation des composants
 @st.cache_resource
-def initialize_components():
-    quiz_generator = modules["QuizGenerator"]()
-    progress_tracker = modules["ProgressTracker"](db_path="user_progress.db")
-    course_recommender = modules["CourseRecommender"](progress_tracker)
-    skills_analyzer = modules["SkillsAnalyzer"](progress_tracker)
-    return None, quiz_generator, progress_tracker, course_recommender, skills_analyzer
+def get_chat_store():
+    from chat_store import ChatStore
+    return ChatStore()
+
+# Lectures de progression mises en cache par (utilisateur, version des données).
+# Chaque écriture de ProgressTracker incrémente la version: une relance de la
+# page sans nouvelle écriture est servie depuis la mémoire. Les agrégats du
+# lecteur analytique sont clés par get_dashboard_version, qui ajoute la
+# génération d'un éventuel instantané Parquet.
+@st.cache_data(max_entries=PROGRESS_CACHE_ENTRIES, show_spinner=False)
+def load_home_stats(user_id, data_version):
+    return get_home_stats(get_progress_tracker().db_path, user_id)
+
+@st.cache_data(max_entries=PROGRESS_CACHE_ENTRIES, show_spinner=False)
+def load_progress_data(user_id, dashboard_version, period):
+    progress_tracker = get_progress_tracker()
+    analytics = progress_tracker.get_analytics()
+    return {
+        "summary": analytics.summary(user_id),
+        "quiz_by_topic": analytics.quiz_percentage_by_topic(user_id),
+        "study_by_topic": analytics.study_minutes_by_topic(user_id),
+        "quiz_by_day": analytics.quiz_percentage_by_period(user_id, "day"),
+        "study_by_period": analytics.study_minutes_by_period(user_id, period),
+        "skills": read_frame(progress_tracker.db_path, "skills_detail", (user_id,)),
+    }
 
-vector_store, quiz_generator, progress_tracker, course_recommender, skills_analyzer = initialize_components()
+@st.cache_data(max_entries=PROGRESS_CACHE_ENTRIES, show_spinner=False)
+def load_history(user_id, query_name, domain_version):
+    # Version du seul domaine concerné (quiz ou étude): une écriture dans l'autre ne l'invalide pas
+    return read_frame(get_progress_tracker().db_path, query_name, (user_id, HISTORY_TABLE_LIMIT))
 
 # CSS personnalisé pour l'interface d'authentification
 st.markdown("""
@@ -112,7 +152,13 @@ if "current_topic" not in st.session_state:
 if "current_syllabus" not in st.session_state:
     st.session_state.current_syllabus = None
 if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = []  # CHAT_WINDOW derniers messages, la conversation complète est dans ChatStore
+if "chat_conversation_id" not in st.session_state:
+    st.session_state.chat_conversation_id = str(uuid.uuid4())
+if "chat_message_count" not in st.session_state:
+    st.session_state.chat_message_count = 0
+if "chat_earlier_count" not in st.session_state:
+    st.session_state.chat_earlier_count = 0  # messages antérieurs à la fenêtre affichés à la demande
 if "quiz_active" not in st.session_state:
     st.session_state.quiz_active = False
 if "current_quiz" not in st.session_state:
@@ -186,6 +232,30 @@ def logout_callback():
     # Redirection vers la page de connexion
     st.rerun()
 
+def add_chat_message(role, content):
+    """Enregistre un message de la conversation et ne garde en session que les derniers"""
+    message = get_chat_store().append(st.session_state.chat_conversation_id, role, content)
+    history = st.session_state.chat_history + [message]
+    if len(history) > CHAT_WINDOW and st.session_state.chat_earlier_count:
+        st.session_state.chat_earlier_count += 1  # le message sorti de la fenêtre reste affiché
+    st.session_state.chat_history = history[-CHAT_WINDOW:]
+    st.session_state.chat_message_count += 1
+    return message
+
+def load_earlier_messages():
+    hidden = st.session_state.chat_message_count - len(st.session_state.chat_history) - st.session_state.chat_earlier_count
+    st.session_state.chat_earlier_count += min(CHAT_WINDOW, hidden)
+
+def hide_earlier_messages():
+    st.session_state.chat_earlier_count = 0
+
+def show_chart(charts, chart_specs, name):
+    """Affiche un graphique: PNG rendu par le serveur ou graphique Vega-Lite natif"""
+    if name in charts:
+        st.image(charts[name])
+    else:
+        st.vega_lite_chart(vega_lite_spec(chart_specs[name]), use_container_width=True)
+
 def switch_to_register():
     st.session_state.auth_page = "register"
     st.rerun()
@@ -257,6 +327,13 @@ if not st.session_state.authenticated:
             st.markdown("© 2025 IntelliPath - Votre assistant d'apprentissage personnalisé")
 
 else:
+    # Vérifier la session à chaque chargement de page (servie par le cache du gestionnaire)
+    session_valid, _ = user_manager.validate_session(st.session_state.session_id)
+    if not session_valid:
+        logout_callback()
+    
+    progress_tracker = get_progress_tracker()
+    
     # Sidebar
     with st.sidebar:
         st.title("IntelliPath")
@@ -294,28 +371,11 @@ else:
         # Statistiques utilisateur
         st.subheader("Votre tableau de bord")
         
-        # Récupérer les statistiques de l'utilisateur
-        conn = sqlite3.connect(progress_tracker.db_path)
-        
-        # Quiz complétés
-        quiz_count = pd.read_sql(f"""
-        SELECT COUNT(*) as count FROM quiz_results 
-        WHERE user_id = '{st.session_state.user_id}'
-        """, conn).iloc[0]['count']
-        
-        # Temps d'étude total
-        study_time = pd.read_sql(f"""
-        SELECT SUM(duration_minutes) as total FROM study_sessions 
-        WHERE user_id = '{st.session_state.user_id}'
-        """, conn).iloc[0]['total']
-        
-        # Compétences acquises
-        skills_count = pd.read_sql(f"""
-        SELECT COUNT(*) as count FROM skills 
-        WHERE user_id = '{st.session_state.user_id}'
-        """, conn).iloc[0]['count']
-        
-        conn.close()
+        # Récupérer les statistiques de l'utilisateur (quiz, temps d'étude, compétences)
+        quiz_count, study_time, skills_count = load_home_stats(
+            st.session_state.user_id,
+            progress_tracker.get_data_version(st.session_state.user_id)
+        )
         
         # Afficher les statistiques
         col1, col2, col3 = st.columns(3)
@@ -342,10 +402,13 @@ else:
             if st.button("Générer le programme", key="generate_syllabus_button") and topic_input:
                 with st.spinner("Génération du programme en cours..."):
                     task = f"Generate a course syllabus to teach the topic: {topic_input}"
-                    syllabus = modules["generate_syllabus"](topic_input, task)
+                    from generating_syllabus import generate_syllabus
+                    from teaching_agent import get_teaching_agent
+                    
+                    syllabus = generate_syllabus(topic_input, task)
                     st.session_state.current_syllabus = syllabus
                     st.session_state.current_topic = topic_input
-                    modules["teaching_agent"].seed_agent(syllabus, topic_input)
+                    get_teaching_agent().seed_agent(syllabus, topic_input)
                     st.session_state.study_start_time = datetime.now()  # Démarrer le compteur de temps
                     st.success(f"Programme pour {topic_input} généré avec succès!")
         
@@ -357,8 +420,29 @@ else:
             # Section de conversation avec l'agent
             st.subheader("Discutez avec votre instructeur")
             
-            # Affichage de l'historique des messages
-            for message in st.session_state.chat_history:
+            # Affichage de l'historique des messages: seuls les derniers sont en session,
+            # les précédents sont relus depuis ChatStore par pages de CHAT_WINDOW messages
+            hidden_count = (st.session_state.chat_message_count - len(st.session_state.chat_history)
+                            - st.session_state.chat_earlier_count)
+            history_col1, history_col2 = st.columns(2)
+            with history_col1:
+                if hidden_count > 0:
+                    st.button(f"Afficher les messages précédents ({hidden_count})", key="load_earlier_messages",
+                              on_click=load_earlier_messages)
+            with history_col2:
+                if st.session_state.chat_earlier_count:
+                    st.button("Masquer les messages précédents", key="hide_earlier_messages",
+                              on_click=hide_earlier_messages)
+            
+            earlier_messages = []
+            if st.session_state.chat_earlier_count and st.session_state.chat_history:
+                earlier_messages = get_chat_store().recent(
+                    st.session_state.chat_conversation_id,
+                    st.session_state.chat_earlier_count,
+                    before_id=st.session_state.chat_history[0]["id"]
+                )
+            
+            for message in earlier_messages + st.session_state.chat_history:
                 if message["role"] == "user":
                     st.chat_message("user").write(message["content"])
                 else:
@@ -368,16 +452,19 @@ else:
             user_input = st.chat_input("Posez une question à votre instructeur...", key="chat_input")
             if user_input:
                 # Ajouter le message de l'utilisateur à l'historique
-                st.session_state.chat_history.append({"role": "user", "content": user_input})
+                add_chat_message("user", user_input)
                 st.chat_message("user").write(user_input)
                 
                 # Traiter le message avec l'agent intelligent
                 with st.spinner("L'instructeur réfléchit..."):
-                    modules["teaching_agent"].human_step(user_input)
-                    response = modules["teaching_agent"].instructor_step().rstrip("<END_OF_TURN>")
+                    from teaching_agent import get_teaching_agent
+                    
+                    teaching_agent = get_teaching_agent()
+                    teaching_agent.human_step(user_input)
+                    response = teaching_agent.instructor_step().rstrip("<END_OF_TURN>")
                     
                     # Ajouter la réponse à l'historique
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
+                    add_chat_message("assistant", response)
                     st.chat_message("assistant").write(response)
                     
                 # Enregistrer la session d'étude (temps passé à discuter avec l'instructeur)
@@ -395,6 +482,7 @@ else:
     # Page Quiz
     elif page == "Quiz":
         st.title("Quiz et exercices interactifs")
+        quiz_generator = get_quiz_generator()
         
         if not st.session_state.current_topic:
             st.warning("Veuillez d'abord sélectionner un sujet d'étude dans la page Cours.")
@@ -553,99 +641,71 @@ else:
         if not st.session_state.user_id:
             st.warning("Identifiant utilisateur non détecté. Veuillez vous identifier.")
         else:
+            # Période choisie dans l'onglet "Temps d'étude" (valeur du widget lors du dernier rendu)
+            period_label = st.session_state.get("study_period_radio", "Quotidien")
+            period = "day" if period_label == "Quotidien" else "week"
+            
+            # Récupérer les données de progression (agrégats en cache jusqu'à la prochaine écriture
+            # ou au prochain rafraîchissement de l'instantané analytique)
+            data_version = progress_tracker.get_data_version(st.session_state.user_id)
+            dashboard_version = progress_tracker.get_dashboard_version(st.session_state.user_id)
+            progress_data = load_progress_data(st.session_state.user_id, dashboard_version, period)
+            summary = progress_data["summary"]
+            quiz_by_topic = progress_data["quiz_by_topic"]
+            study_by_topic = progress_data["study_by_topic"]
+            quiz_by_day = progress_data["quiz_by_day"]
+            study_by_period = progress_data["study_by_period"]
+            skills = progress_data["skills"]
+            
+            # Dessiner tous les graphiques de la page en parallèle (cache par version des données)
+            chart_specs = {}
+            if quiz_by_topic or study_by_topic:
+                chart_specs["summary"] = summary_chart(quiz_by_topic, study_by_topic)
+            if quiz_by_day:
+                chart_specs["quiz_history"] = quiz_history_chart(quiz_by_day)
+            if study_by_period:
+                chart_specs[f"study_by_{period}"] = study_period_chart(study_by_period, period, period_label)
+            if not skills.empty:
+                chart_specs["skills"] = skills_chart(list(zip(skills['skill_name'], skills['proficiency_level'])))
+            if CHART_MODE == "client":
+                charts = {}  # Dessinés par le navigateur à partir des données agrégées
+            else:
+                charts = chart_renderer.render_charts(st.session_state.user_id, dashboard_version, chart_specs)
+            
             # Créer les onglets pour les différentes vues de progression
             tabs = st.tabs(["Résumé", "Quiz", "Temps d'étude", "Compétences", "Analyse"])
             
             with tabs[0]:  # Résumé
                 st.subheader("Résumé de votre progression")
                 
-                # Récupérer les données de progression
-                conn = sqlite3.connect(progress_tracker.db_path)
-                
-                # Récupérer les quiz complétés
-                quiz_results = pd.read_sql(f"""
-                SELECT topic, score, max_score, completion_time 
-                FROM quiz_results 
-                WHERE user_id = '{st.session_state.user_id}'
-                ORDER BY completion_time DESC
-                """, conn)
-                
-                # Récupérer les sessions d'étude
-                study_sessions = pd.read_sql(f"""
-                SELECT topic, duration_minutes, session_date 
-                FROM study_sessions 
-                WHERE user_id = '{st.session_state.user_id}'
-                ORDER BY session_date DESC
-                """, conn)
-                
-                # Récupérer les compétences
-                skills = pd.read_sql(f"""
-                SELECT skill_name, proficiency_level, last_updated 
-                FROM skills 
-                WHERE user_id = '{st.session_state.user_id}'
-                ORDER BY proficiency_level DESC
-                """, conn)
-                
-                conn.close()
-                
                 # Afficher les statistiques générales
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    total_quiz = len(quiz_results)
-                    st.metric("Quiz complétés", total_quiz)
+                    st.metric("Quiz complétés", summary["quiz_count"])
                 
                 with col2:
-                    total_time = study_sessions['duration_minutes'].sum() if not study_sessions.empty else 0
-                    st.metric("Temps d'étude total", f"{total_time} min")
+                    st.metric("Temps d'étude total", f"{summary['study_minutes']} min")
                 
                 with col3:
-                    avg_score = quiz_results['score'].sum() / quiz_results['max_score'].sum() * 100 if not quiz_results.empty else 0
-                    st.metric("Score moyen aux quiz", f"{avg_score:.1f}%")
+                    st.metric("Score moyen aux quiz", f"{summary['avg_score']:.1f}%")
                 
                 # Afficher un graphique résumé
-                if not quiz_results.empty or not study_sessions.empty:
+                if quiz_by_topic or study_by_topic:
                     st.subheader("Aperçu des activités récentes")
                     
-                    fig, ax = plt.subplots(1, 2, figsize=(12, 6))
-                    
-                    # Graphique des performances par sujet
-                    if not quiz_results.empty:
-                        quiz_summary = quiz_results.groupby('topic').apply(
-                            lambda x: (x['score'].sum() / x['max_score'].sum()) * 100
-                        ).reset_index(name='percentage')
-                        
-                        if not quiz_summary.empty:
-                            quiz_summary.plot(kind='bar', x='topic', y='percentage', ax=ax[0], color='skyblue')
-                            ax[0].set_title('Performance par sujet (%)')
-                            ax[0].set_ylabel('Score moyen (%)')
-                            ax[0].set_xlabel('Sujet')
-                            ax[0].set_ylim(0, 100)
-                            
-                    # Graphique du temps d'étude par sujet
-                    if not study_sessions.empty:
-                        study_summary = study_sessions.groupby('topic')['duration_minutes'].sum().reset_index()
-                        
-                        if not study_summary.empty:
-                            study_summary.plot(kind='pie', y='duration_minutes', labels=study_summary['topic'], 
-                                            autopct='%1.1f%%', ax=ax[1], startangle=90)
-                            ax[1].set_title('Répartition du temps d\'étude')
-                            ax[1].set_ylabel('')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
+                    # Performances par sujet et répartition du temps d'étude
+                    show_chart(charts, chart_specs, "summary")
                     
                     # Génération du tableau de bord
                     if st.button("Générer un tableau de bord complet"):
                         with st.spinner("Génération du tableau de bord en cours..."):
-                            dashboard_path = progress_tracker.generate_dashboard(
-                                st.session_state.user_id,
-                                output_dir="dashboard"
-                            )
+                            # Image en cache tant que les données de progression n'ont pas changé
+                            dashboard_png = progress_tracker.get_dashboard_png(st.session_state.user_id, chart_renderer)
                             
-                            if dashboard_path and os.path.exists(dashboard_path):
+                            if dashboard_png:
                                 st.success("Tableau de bord généré avec succès!")
-                                st.image(dashboard_path, caption="Tableau de bord de progression")
+                                st.image(dashboard_png, caption="Tableau de bord de progression")
                             else:
                                 st.error("Erreur lors de la génération du tableau de bord.")
                 else:
@@ -654,16 +714,13 @@ else:
             with tabs[1]:  # Quiz
                 st.subheader("Historique des quiz")
                 
-                if not quiz_results.empty:
-                    # Convertir la colonne de date
-                    quiz_results['completion_time'] = pd.to_datetime(quiz_results['completion_time'])
-                    quiz_results['score_percentage'] = (quiz_results['score'] / quiz_results['max_score']) * 100
-                    quiz_results['date'] = quiz_results['completion_time'].dt.strftime('%d/%m/%Y %H:%M')
+                if summary["quiz_count"]:
+                    # Seuls les derniers résultats sont affichés dans le tableau
+                    quiz_results = load_history(st.session_state.user_id, "quiz_history_recent", data_version[0])
                     
                     # Afficher le tableau des résultats
                     st.dataframe(
-                        quiz_results[['topic', 'score', 'max_score', 'score_percentage', 'date']]
-                        .rename(columns={
+                        quiz_results.rename(columns={
                             'topic': 'Sujet',
                             'score': 'Score',
                             'max_score': 'Score max',
@@ -673,38 +730,23 @@ else:
                         hide_index=True
                     )
                     
-                    # Graphique d'évolution des scores
+                    # Graphique d'évolution des scores (moyenne quotidienne)
                     st.subheader("Évolution de vos performances")
                     
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    quiz_results.sort_values('completion_time').plot(
-                        x='completion_time', 
-                        y='score_percentage', 
-                        kind='line', 
-                        marker='o',
-                        ax=ax
-                    )
-                    ax.set_xlabel('Date')
-                    ax.set_ylabel('Score (%)')
-                    ax.set_ylim(0, 100)
-                    ax.grid(True, linestyle='--', alpha=0.7)
-                    
-                    st.pyplot(fig)
+                    show_chart(charts, chart_specs, "quiz_history")
                 else:
                     st.info("Aucun historique de quiz disponible. Complétez des quiz pour voir votre progression.")
             
             with tabs[2]:  # Temps d'étude
                 st.subheader("Historique des sessions d'étude")
                 
-                if not study_sessions.empty:
-                    # Convertir la colonne de date
-                    study_sessions['session_date'] = pd.to_datetime(study_sessions['session_date'])
-                    study_sessions['date'] = study_sessions['session_date'].dt.strftime('%d/%m/%Y %H:%M')
+                if summary["study_sessions"]:
+                    # Seules les dernières sessions sont affichées dans le tableau
+                    study_sessions = load_history(st.session_state.user_id, "study_history_recent", data_version[1])
                     
                     # Afficher le tableau des sessions
                     st.dataframe(
-                        study_sessions[['topic', 'duration_minutes', 'date']]
-                        .rename(columns={
+                        study_sessions.rename(columns={
                             'topic': 'Sujet',
                             'duration_minutes': 'Durée (min)',
                             'date': 'Date'
@@ -712,32 +754,27 @@ else:
                         hide_index=True
                     )
                     
-                    # Graphique du temps d'étude quotidien
-                    st.subheader("Temps d'étude quotidien")
-                    
-                    daily_study = study_sessions.copy()
-                    daily_study['date'] = daily_study['session_date'].dt.date
-                    daily_summary = daily_study.groupby('date')['duration_minutes'].sum().reset_index()
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    daily_summary.plot(x='date', y='duration_minutes', kind='bar', ax=ax, color='green')
-                    ax.set_xlabel('Date')
-                    ax.set_ylabel('Temps d\'étude (minutes)')
-                    ax.set_title('Temps d\'étude quotidien')
+                    # Graphique du temps d'étude par période (un changement relance la page)
+                    st.radio(
+                        "Période:",
+                        ["Quotidien", "Hebdomadaire"],
+                        horizontal=True,
+                        key="study_period_radio"
+                    )
+                    st.subheader(f"Temps d'étude {period_label.lower()}")
                     
-                    plt.tight_layout()
-                    st.pyplot(fig)
+                    show_chart(charts, chart_specs, f"study_by_{period}")
                     
                     # Statistiques de temps d'étude
                     st.subheader("Statistiques de temps d'étude")
                     
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Total", f"{study_sessions['duration_minutes'].sum()} min")
+                        st.metric("Total", f"{summary['study_minutes']} min")
                     with col2:
-                        st.metric("Moyenne par session", f"{study_sessions['duration_minutes'].mean():.1f} min")
+                        st.metric("Moyenne par session", f"{summary['avg_session_minutes']:.1f} min")
                     with col3:
-                        st.metric("Sessions", f"{len(study_sessions)}")
+                        st.metric("Sessions", f"{summary['study_sessions']}")
                 else:
                     st.info("Aucun historique de session d'étude disponible. Interagissez avec le cours pour enregistrer votre temps d'étude.")
             
@@ -745,29 +782,12 @@ else:
                 st.subheader("Niveau de compétences")
                 
                 if not skills.empty:
-                    # Afficher un graphique des compétences
-                    fig, ax = plt.subplots(figsize=(10, max(6, len(skills) * 0.5)))
-                    
-                    # Trier par niveau de compétence
-                    skills_sorted = skills.sort_values('proficiency_level')
-                    
-                    # Créer un graphique à barres horizontales
-                    bars = ax.barh(skills_sorted['skill_name'], skills_sorted['proficiency_level'], color='purple')
-                    
-                    # Ajouter les valeurs sur les barres
-                    for bar in bars:
-                        width = bar.get_width()
-                        ax.text(width + 0.1, bar.get_y() + bar.get_height()/2, f'{width:.1f}', 
-                                ha='left', va='center')
-                    
-                    ax.set_xlabel('Niveau de compétence (1-5)')
-                    ax.set_xlim(0, 5.5)
-                    ax.set_title('Niveaux de compétence par sujet')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
+                    # Afficher un graphique des compétences (barres horizontales triées par niveau)
+                    show_chart(charts, chart_specs, "skills")
                     
                     # Tableau des compétences avec date de mise à jour
+                    import pandas as pd
+                    
                     skills['last_updated'] = pd.to_datetime(skills['last_updated'])
                     skills['date_maj'] = skills['last_updated'].dt.strftime('%d/%m/%Y %H:%M')
                     
@@ -839,10 +859,11 @@ else:
             
             with tabs[4]:  # Analyse
                 st.subheader("Analyse de vos forces et faiblesses")
+                skills_analyzer = get_skills_analyzer()
                 
-                if not skills.empty or not quiz_results.empty:
-                    # Analyse des performances
-                    performance_analysis = skills_analyzer.analyze_quiz_performance(st.session_state.user_id)
+                if not skills.empty or summary["quiz_count"]:
+                    # Forces et faiblesses calculées localement (sans LLM), par moyenne des pourcentages des quiz
+                    performance_analysis = skills_analyzer.quiz_performance(st.session_state.user_id)
                     
                     # Afficher les forces et faiblesses
                     col1, col2 = st.columns(2)
@@ -865,53 +886,87 @@ else:
                         else:
                             st.info("Aucun point faible identifié pour l'instant.")
                     
-                    # Analyse détaillée
+                    # Analyse détaillée: générée par le LLM à la demande, puis resservie
+                    # tant qu'aucun nouveau résultat de quiz n'est enregistré
                     st.markdown("### Analyse détaillée")
-                    st.markdown(performance_analysis["analysis"])
+                    
+                    if performance_analysis["topic_performance"]:
+                        detailed_analysis = skills_analyzer.cached_analysis(st.session_state.user_id, data_version[0])
+                        button_label = "Régénérer l'analyse" if detailed_analysis else "Générer l'analyse détaillée"
+                        
+                        if st.button(button_label, key="detailed_analysis_button"):
+                            with st.spinner("Analyse en cours..."):
+                                detailed_analysis = skills_analyzer.detailed_analysis(
+                                    st.session_state.user_id,
+                                    data_version[0],
+                                    refresh=detailed_analysis is not None
+                                )
+                        
+                        if detailed_analysis:
+                            st.markdown(detailed_analysis)
+                        else:
+                            st.info("Cliquez sur le bouton pour obtenir une analyse détaillée et des recommandations personnalisées.")
+                    else:
+                        st.info("Pas assez de données pour une analyse détaillée.")
                     
                     # Analyse des écarts de compétences pour un objectif professionnel
                     st.subheader("Analyse des écarts de compétences")
                     
                     career_goal = st.text_input("Entrez votre objectif professionnel ou domaine d'intérêt:")
                     
-                    if career_goal:
-                        with st.spinner("Analyse en cours..."):
-                            gap_analysis = skills_analyzer.skill_gap_analysis(
-                                st.session_state.user_id,
-                                target_career=career_goal
-                            )
-                            
-                            # Afficher l'analyse des écarts
-                            st.markdown(f"### Analyse pour: {career_goal}")
-                            
-                            # Compétences requises
-                            st.markdown("#### Compétences requises")
-                            if "required_skills" in gap_analysis and gap_analysis["required_skills"]:
-                                for skill in gap_analysis["required_skills"]:
-                                    st.markdown(f"- {skill}")
-                            else:
-                                st.info("Aucune compétence requise spécifique identifiée.")
-                            
-                            # Compétences existantes
-                            st.markdown("#### Compétences que vous possédez déjà")
-                            if "existing_skills" in gap_analysis and gap_analysis["existing_skills"]:
-                                for skill in gap_analysis["existing_skills"]:
-                                    st.markdown(f"- {skill}")
-                            else:
-                                st.info("Aucune compétence existante identifiée.")
-                            
-                            # Compétences manquantes
-                            st.markdown("#### Compétences à acquérir")
-                            if "missing_skills" in gap_analysis and gap_analysis["missing_skills"]:
-                                for skill in gap_analysis["missing_skills"]:
-                                    st.markdown(f"- {skill}")
-                            else:
-                                st.info("Aucune compétence manquante identifiée.")
-                            
-                            # Parcours d'apprentissage recommandé
-                            st.markdown("#### Parcours d'apprentissage recommandé")
-                            if "learning_path" in gap_analysis:
-                                st.markdown(gap_analysis["learning_path"])
+                    # Générée par le LLM uniquement sur demande, puis resservie tant que
+                    # l'objectif et les compétences enregistrées sont inchangés
+                    gap_analysis = None
+                    if career_goal.strip():
+                        gap_analysis = skills_analyzer.cached_gap_analysis(
+                            st.session_state.user_id, data_version[2], career_goal
+                        )
+                        gap_button_label = "Régénérer l'analyse des écarts" if gap_analysis else "Analyser les écarts"
+                        
+                        if st.button(gap_button_label, key="gap_analysis_button"):
+                            with st.spinner("Analyse en cours..."):
+                                gap_analysis = skills_analyzer.gap_analysis(
+                                    st.session_state.user_id,
+                                    data_version[2],
+                                    career_goal,
+                                    refresh=gap_analysis is not None
+                                )
+                        
+                        if gap_analysis is None:
+                            st.info("Cliquez sur le bouton pour analyser les écarts avec cet objectif.")
+                    
+                    if gap_analysis is not None:
+                        # Afficher l'analyse des écarts
+                        st.markdown(f"### Analyse pour: {career_goal}")
+                        
+                        # Compétences requises
+                        st.markdown("#### Compétences requises")
+                        if "required_skills" in gap_analysis and gap_analysis["required_skills"]:
+                            for skill in gap_analysis["required_skills"]:
+                                st.markdown(f"- {skill}")
+                        else:
+                            st.info("Aucune compétence requise spécifique identifiée.")
+                        
+                        # Compétences existantes
+                        st.markdown("#### Compétences que vous possédez déjà")
+                        if "existing_skills" in gap_analysis and gap_analysis["existing_skills"]:
+                            for skill in gap_analysis["existing_skills"]:
+                                st.markdown(f"- {skill}")
+                        else:
+                            st.info("Aucune compétence existante identifiée.")
+                        
+                        # Compétences manquantes
+                        st.markdown("#### Compétences à acquérir")
+                        if "missing_skills" in gap_analysis and gap_analysis["missing_skills"]:
+                            for skill in gap_analysis["missing_skills"]:
+                                st.markdown(f"- {skill}")
+                        else:
+                            st.info("Aucune compétence manquante identifiée.")
+                        
+                        # Parcours d'apprentissage recommandé
+                        st.markdown("#### Parcours d'apprentissage recommandé")
+                        if "learning_path" in gap_analysis:
+                            st.markdown(gap_analysis["learning_path"])
                 else:
                     st.info("Pas assez de données pour effectuer une analyse approfondie. Complétez plus de quiz et enregistrez vos compétences pour obtenir une analyse détaillée.")
                     
@@ -941,6 +996,7 @@ else:
     # Page Recommandations
     elif page == "Recommandations":
         st.title("Recommandations personnalisées")
+        course_recommender = get_course_recommender()
         
         if not st.session_state.user_id:
             st.warning("Identifiant utilisateur non détecté. Veuillez vous identifier.")
@@ -134,6 +134,21 @@ class TeachingGPT(Chain, BaseModel):
 # Set up the teaching agent
 config = dict(conversation_history=[], syllabus="", conversation_topic="")
 
-# Initialisation du modèle Llama 3 via OllamaLLM au lieu de ChatOpenAI
-llm = OllamaLLM(model="llama3", temperature=0.9)
-teaching_agent = TeachingGPT.from_llm(llm, verbose=False, **config)
+_teaching_agent = None
+
+
+def get_teaching_agent() -> TeachingGPT:
+    """Construit l'agent au premier usage (aucun modèle créé à l'import du module)"""
+    global _teaching_agent
+    if _teaching_agent is None:
+        # Initialisation du modèle Llama 3 via OllamaLLM au lieu de ChatOpenAI
+        llm = OllamaLLM(model="llama3", temperature=0.9)
+        _teaching_agent = TeachingGPT.from_llm(llm, verbose=False, **config)
+    return _teaching_agent
+
+
+def __getattr__(name):
+    # Compatibilité: `from teaching_agent import teaching_agent` construit l'agent à la demande
+    if name == "teaching_agent":
+        return get_teaching_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
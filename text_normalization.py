@@ -0,0 +1,29 @@
+# text_normalization.py
+# Normalisation des textes saisis et indexés (minuscules, accents retirés).
+#
+# Partagée par le catalogue de cours (jetons de l'index) et par les clés de
+# cache des analyses et recommandations (mots-clés, intérêts, objectifs).
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text):
+    """Minuscules sans accents ("Données" -> "donnees")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(fold(text))
+
+
+def normalize_keyword(text):
+    """Mot-clé replié, espaces réduits ("  Données  Web " -> "donnees web")"""
+    return " ".join(fold(text or "").split())
+
+
+def normalize_interests(interests):
+    """Intérêts séparés par des virgules, normalisés, sans doublons et triés (clé de cache)"""
+    return sorted({normalize_keyword(keyword) for keyword in (interests or "").split(",")} - {""})
@@ -0,0 +1,82 @@
+# ttl_cache.py
+# Cache mémoire borné avec expiration (TTL) par entrée, partagé entre threads.
+#
+# Les entrées les moins récemment utilisées sont évincées lorsque la capacité
+# est atteinte; chaque entrée peut avoir sa propre durée de vie (par exemple
+# plafonnée à l'expiration d'une session). Les compteurs de succès et d'échecs
+# permettent de suivre le taux de réussite du cache.
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # clé -> (valeur, échéance monotone)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Renvoie la valeur en cache ou `default` si elle est absente ou expirée"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, deadline = entry
+            if deadline <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Ajoute une valeur; `ttl` (secondes) est plafonné par le TTL du cache"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Supprime une entrée du cache"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Supprime les entrées dont la valeur satisfait `predicate`"""
+        with self._lock:
+            for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Renvoie les compteurs du cache et le taux de réussite"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
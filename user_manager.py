@@ -1,81 +1,157 @@
 # user_manager.py
 import sqlite3
 import hashlib
+import hmac
 import uuid
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+from schema_migrations import migrate
+from sqlite_store import connect, run_write
+from ttl_cache import TTLCache
+
+# Purge des sessions expirées: intervalle (secondes) et taille des lots
+SESSION_SWEEP_INTERVAL = int(os.environ.get("INTELLIPATH_SESSION_SWEEP_INTERVAL", "3600"))
+SESSION_PURGE_BATCH_SIZE = 1000
+
+# Cache mémoire des sessions et profils (durée de vie en secondes, nombre d'entrées)
+AUTH_CACHE_TTL = int(os.environ.get("INTELLIPATH_AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_SIZE = int(os.environ.get("INTELLIPATH_AUTH_CACHE_SIZE", "10000"))
+
+# Dérivation des mots de passe: "scrypt" (coût = log2 de N) ou "pbkdf2_sha256" (coût = itérations)
+PASSWORD_KDF_COSTS = {"scrypt": 14, "pbkdf2_sha256": 600000}
+PASSWORD_KDF = os.environ.get("INTELLIPATH_PASSWORD_KDF", "scrypt")
+PASSWORD_KDF_COST = int(os.environ.get("INTELLIPATH_PASSWORD_KDF_COST", PASSWORD_KDF_COSTS.get(PASSWORD_KDF, 0)))
+# Threads dédiés au hachage: une rafale de connexions ne bloque pas le rendu des pages
+PASSWORD_HASH_WORKERS = int(os.environ.get("INTELLIPATH_PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_PARALLELISM = 1
+
+def derive_password_hash(password, salt, kdf=PASSWORD_KDF, cost=PASSWORD_KDF_COST):
+    """Dérive le hachage d'un mot de passe, encodé sous la forme "kdf$coût$hachage" """
+    if kdf == "scrypt":
+        n = 2 ** cost
+        digest = hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=SCRYPT_BLOCK_SIZE,
+                                p=SCRYPT_PARALLELISM, maxmem=256 * SCRYPT_BLOCK_SIZE * n)
+    elif kdf == "pbkdf2_sha256":
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), cost)
+    else:
+        raise ValueError(f"Fonction de dérivation inconnue: {kdf} (attendu: {', '.join(PASSWORD_KDF_COSTS)})")
+    return f"{kdf}${cost}${digest.hex()}"
+
+def verify_password_hash(password, salt, stored_hash):
+    """Vérifie un mot de passe; renvoie (valide, à re-hacher avec les paramètres actuels)"""
+    if "$" not in stored_hash:
+        # Ancien format: un seul tour de SHA-256
+        legacy_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, stored_hash), True
+    
+    kdf, cost, _ = stored_hash.split("$", 2)
+    valid = hmac.compare_digest(derive_password_hash(password, salt, kdf, int(cost)), stored_hash)
+    return valid, (kdf, int(cost)) != (PASSWORD_KDF, PASSWORD_KDF_COST)
+
+def _create_auth_tables(cursor):
+    # Table utilisateurs
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE,
+        email TEXT UNIQUE,
+        password_hash TEXT,
+        salt TEXT,
+        created_at TIMESTAMP,
+        last_login TIMESTAMP,
+        is_active BOOLEAN DEFAULT 1
+    )
+    ''')
+    
+    # Table sessions
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id TEXT,
+        created_at TIMESTAMP,
+        expires_at TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''')
+
+def _create_session_indexes(cursor):
+    # Index pour la validation et la purge des sessions expirées
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+
+def _create_password_resets(cursor):
+    # Tokens de réinitialisation de mot de passe
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS password_resets (
+        token TEXT PRIMARY KEY,
+        user_id TEXT,
+        expires_at TIMESTAMP,
+        used BOOLEAN DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''')
+
+# Migrations ordonnées du schéma (PRAGMA user_version = nombre de migrations appliquées)
+MIGRATIONS = [
+    _create_auth_tables,
+    _create_session_indexes,
+    _create_password_resets,
+]
+
 class UserManager:
     def __init__(self, db_path="user_auth.db"):
         self.db_path = db_path
+        self._sweeper = None
+        self._sweeper_stop = threading.Event()
+        # session_id -> (user_id, username, expires_at) et user_id -> profil
+        self._session_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+        self._user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+        self._kdf_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-kdf")
         self.init_db()
     
     def init_db(self):
-        """Initialise la base de données des utilisateurs"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Table utilisateurs
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            username TEXT UNIQUE,
-            email TEXT UNIQUE,
-            password_hash TEXT,
-            salt TEXT,
-            created_at TIMESTAMP,
-            last_login TIMESTAMP,
-            is_active BOOLEAN DEFAULT 1
-        )
-        ''')
-        
-        # Table sessions
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            user_id TEXT,
-            created_at TIMESTAMP,
-            expires_at TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Initialise la base de données des utilisateurs (migrations appliquées une seule fois)"""
+        # Plusieurs processus peuvent écrire dans la base: journal WAL (voir sqlite_store)
+        migrate(self.db_path, MIGRATIONS, journal_mode="WAL")
     
     def _hash_password(self, password, salt=None):
-        """Chiffre un mot de passe avec sel"""
+        """Chiffre un mot de passe avec sel (dérivation exécutée dans le pool de hachage)"""
         if salt is None:
             salt = uuid.uuid4().hex
         
-        # Utiliser SHA-256 pour le hachage
-        hashed_password = hashlib.sha256((password + salt).encode()).hexdigest()
+        hashed_password = self._kdf_pool.submit(derive_password_hash, password, salt).result()
         return hashed_password, salt
     
+    def _verify_password(self, password, salt, stored_hash):
+        """Vérifie un mot de passe dans le pool de hachage; renvoie (valide, à re-hacher)"""
+        return self._kdf_pool.submit(verify_password_hash, password, salt, stored_hash).result()
+    
     def register_user(self, username, email, password):
         """Inscrit un nouvel utilisateur"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Vérifier si l'utilisateur existe déjà
-            cursor.execute("SELECT id FROM users WHERE username = ? OR email = ?", (username, email))
-            if cursor.fetchone():
-                conn.close()
-                return False, "Nom d'utilisateur ou email déjà utilisé"
-            
-            # Générer l'ID utilisateur et hacher le mot de passe
+            # Générer l'ID utilisateur et hacher le mot de passe (hors transaction d'écriture)
             user_id = str(uuid.uuid4())
             hashed_password, salt = self._hash_password(password)
             
-            # Insérer le nouvel utilisateur
-            cursor.execute('''
-            INSERT INTO users (id, username, email, password_hash, salt, created_at, last_login)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, username, email, hashed_password, salt, datetime.now(), datetime.now()))
-            
-            conn.commit()
-            conn.close()
+            def write(cursor):
+                # Vérifier si l'utilisateur existe déjà
+                cursor.execute("SELECT id FROM users WHERE username = ? OR email = ?", (username, email))
+                if cursor.fetchone():
+                    return False
+                
+                # Insérer le nouvel utilisateur
+                cursor.execute('''
+                INSERT INTO users (id, username, email, password_hash, salt, created_at, last_login)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (user_id, username, email, hashed_password, salt, datetime.now(), datetime.now()))
+                return True
+            
+            if not run_write(self.db_path, write):
+                return False, "Nom d'utilisateur ou email déjà utilisé"
             
             return True, user_id
         except Exception as e:
@@ -84,45 +160,58 @@ class UserManager:
     def login_user(self, username_or_email, password):
         """Authentifie un utilisateur"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path)
             cursor = conn.cursor()
             
             # Rechercher l'utilisateur
             cursor.execute(
-                "SELECT id, password_hash, salt FROM users WHERE (username = ? OR email = ?) AND is_active = 1", 
+                "SELECT id, username, password_hash, salt FROM users WHERE (username = ? OR email = ?) AND is_active = 1", 
                 (username_or_email, username_or_email)
             )
             
             user = cursor.fetchone()
+            conn.close()
             if not user:
-                conn.close()
                 return False, "Utilisateur non trouvé ou inactif"
             
-            user_id, stored_hash, salt = user
+            user_id, username, stored_hash, salt = user
             
             # Vérifier le mot de passe
-            hashed_password, _ = self._hash_password(password, salt)
-            if hashed_password != stored_hash:
-                conn.close()
+            valid, needs_rehash = self._verify_password(password, salt, stored_hash)
+            if not valid:
                 return False, "Mot de passe incorrect"
             
-            # Mettre à jour la date de dernière connexion
-            cursor.execute(
-                "UPDATE users SET last_login = ? WHERE id = ?",
-                (datetime.now(), user_id)
-            )
+            # Mettre à niveau les hachages anciens ou de coût différent
+            new_hash = self._hash_password(password) if needs_rehash else None
             
-            # Créer une session
             session_id = str(uuid.uuid4())
             expires_at = datetime.now() + timedelta(days=7)  # Session d'une semaine
             
-            cursor.execute('''
-            INSERT INTO sessions (session_id, user_id, created_at, expires_at)
-            VALUES (?, ?, ?, ?)
-            ''', (session_id, user_id, datetime.now(), expires_at))
-            
-            conn.commit()
-            conn.close()
+            def write(cursor):
+                if new_hash:
+                    cursor.execute(
+                        "UPDATE users SET password_hash = ?, salt = ? WHERE id = ?",
+                        (*new_hash, user_id)
+                    )
+                
+                # Mettre à jour la date de dernière connexion
+                cursor.execute(
+                    "UPDATE users SET last_login = ? WHERE id = ?",
+                    (datetime.now(), user_id)
+                )
+                
+                # Créer une session
+                cursor.execute('''
+                INSERT INTO sessions (session_id, user_id, created_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ''', (session_id, user_id, datetime.now(), expires_at))
+            
+            run_write(self.db_path, write)
+            
+            # La date de dernière connexion a changé
+            self._user_cache.invalidate(user_id)
+            self._session_cache.set(session_id, (user_id, username, expires_at),
+                                    ttl=(expires_at - datetime.now()).total_seconds())
             
             return True, {"user_id": user_id, "session_id": session_id}
         except Exception as e:
@@ -130,30 +219,37 @@ class UserManager:
     
     def validate_session(self, session_id):
         """Vérifie si une session est valide"""
+        cached = self._session_cache.get(session_id)
+        if cached is not None:
+            user_id, username, expires_at = cached
+            if expires_at > datetime.now():
+                return True, {"user_id": user_id, "username": username}
+            self._session_cache.invalidate(session_id)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path)
             cursor = conn.cursor()
             
-            # Rechercher la session
+            # Rechercher la session non expirée (clé primaire + comparaison dans SQLite)
             cursor.execute('''
-            SELECT s.user_id, u.username, s.expires_at 
+            SELECT s.user_id, u.username, s.expires_at
             FROM sessions s 
             JOIN users u ON s.user_id = u.id 
-            WHERE s.session_id = ?
-            ''', (session_id,))
+            WHERE s.session_id = ? AND s.expires_at > ?
+            ''', (session_id, datetime.now()))
             
             session = cursor.fetchone()
             conn.close()
             
             if not session:
-                return False, "Session non trouvée"
+                return False, "Session non trouvée ou expirée"
             
             user_id, username, expires_at = session
-            expires_at = datetime.strptime(expires_at, '%Y-%m-%d %H:%M:%S.%f')
             
-            # Vérifier si la session a expiré
-            if expires_at < datetime.now():
-                return False, "Session expirée"
+            # Durée de vie en cache plafonnée par l'expiration de la session
+            expires_at = datetime.fromisoformat(expires_at)
+            self._session_cache.set(session_id, (user_id, username, expires_at),
+                                    ttl=(expires_at - datetime.now()).total_seconds())
             
             return True, {"user_id": user_id, "username": username}
         except Exception as e:
@@ -162,22 +258,79 @@ class UserManager:
     def logout_user(self, session_id):
         """Déconnecte un utilisateur en supprimant sa session"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            run_write(self.db_path, lambda cursor: cursor.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)))
             
-            cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-            
-            conn.commit()
-            conn.close()
+            self._session_cache.invalidate(session_id)
             
             return True, "Déconnexion réussie"
         except Exception as e:
             return False, str(e)
     
+    def invalidate_user(self, user_id):
+        """Retire du cache le profil et les sessions d'un utilisateur"""
+        self._user_cache.invalidate(user_id)
+        self._session_cache.invalidate_where(lambda session: session[0] == user_id)
+    
+    def cache_stats(self):
+        """Renvoie les compteurs (succès, échecs, taux de réussite) des caches d'authentification"""
+        return {
+            "sessions": self._session_cache.stats(),
+            "users": self._user_cache.stats(),
+        }
+    
+    def purge_expired_sessions(self, batch_size=SESSION_PURGE_BATCH_SIZE):
+        """Supprime les sessions expirées par lots et renvoie le nombre de sessions supprimées"""
+        def delete_batch(cursor):
+            cursor.execute('''
+            DELETE FROM sessions WHERE rowid IN (
+                SELECT rowid FROM sessions WHERE expires_at <= ? LIMIT ?
+            )
+            ''', (datetime.now(), batch_size))
+            return cursor.rowcount
+        
+        deleted = 0
+        while True:
+            # Lots courts (une transaction chacun) pour ne pas bloquer les écritures concurrentes
+            batch = run_write(self.db_path, delete_batch)
+            deleted += batch
+            if batch < batch_size:
+                break
+        return deleted
+    
+    def start_session_sweeper(self, interval_seconds=SESSION_SWEEP_INTERVAL):
+        """Démarre la purge périodique des sessions expirées dans un thread d'arrière-plan"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return self._sweeper
+        
+        self._sweeper_stop.clear()
+        
+        def sweep():
+            while not self._sweeper_stop.wait(interval_seconds):
+                try:
+                    self.purge_expired_sessions()
+                except sqlite3.Error as e:
+                    print(f"Erreur lors de la purge des sessions: {e}")
+        
+        self._sweeper = threading.Thread(target=sweep, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+        return self._sweeper
+    
+    def stop_session_sweeper(self):
+        """Arrête la purge périodique des sessions"""
+        self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+    
     def get_user_info(self, user_id):
         """Récupère les informations d'un utilisateur"""
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return True, dict(cached)
+        
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path)
             cursor = conn.cursor()
             
             cursor.execute(
@@ -193,108 +346,102 @@ class UserManager:
             
             username, email, created_at, last_login = user
             
-            return True, {
+            user_info = {
                 "user_id": user_id,
                 "username": username,
                 "email": email,
                 "created_at": created_at,
                 "last_login": last_login
             }
+            self._user_cache.set(user_id, user_info)
+            
+            return True, dict(user_info)
         except Exception as e:
             return False, str(e)
         
     def reset_password_request(self, email):
         """Génère un token de réinitialisation de mot de passe"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Vérifier si l'email existe
-            cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-            user = cursor.fetchone()
-            
-            if not user:
-                conn.close()
-                return False, "Email non trouvé"
-            
             # Générer un token unique
             reset_token = str(uuid.uuid4())
             expiry = datetime.now() + timedelta(hours=24)
             
-            # Stocker le token
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS password_resets (
-                token TEXT PRIMARY KEY,
-                user_id TEXT,
-                expires_at TIMESTAMP,
-                used BOOLEAN DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-            ''')
-            
-            cursor.execute('''
-            INSERT INTO password_resets (token, user_id, expires_at)
-            VALUES (?, ?, ?)
-            ''', (reset_token, user[0], expiry))
-            
-            conn.commit()
-            conn.close()
+            def write(cursor):
+                # Vérifier si l'email existe
+                cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
+                user = cursor.fetchone()
+                
+                if not user:
+                    return False
+                
+                # Stocker le token
+                cursor.execute('''
+                INSERT INTO password_resets (token, user_id, expires_at)
+                VALUES (?, ?, ?)
+                ''', (reset_token, user[0], expiry))
+                return True
+            
+            if not run_write(self.db_path, write):
+                return False, "Email non trouvé"
             
             # Dans une application réelle, vous enverriez un email avec le lien de réinitialisation
             # Pour ce prototype, nous retournons simplement le token
             return True, reset_token
         except Exception as e:
             return False, str(e)
-
-def reset_password(self, token, new_password):
-    """Réinitialise le mot de passe avec un token valide"""
-    try:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Vérifier si le token existe et est valide
-        cursor.execute('''
-        SELECT user_id, expires_at, used FROM password_resets 
-        WHERE token = ?
-        ''', (token,))
-        
-        reset = cursor.fetchone()
-        if not reset:
-            conn.close()
-            return False, "Token invalide"
-        
-        user_id, expires_at, used = reset
-        
-        # Vérifier si le token a déjà été utilisé
-        if used:
-            conn.close()
-            return False, "Token déjà utilisé"
-        
-        # Vérifier si le token a expiré
-        expires_at = datetime.strptime(expires_at, '%Y-%m-%d %H:%M:%S.%f')
-        if expires_at < datetime.now():
-            conn.close()
-            return False, "Token expiré"
-        
-        # Mettre à jour le mot de passe
-        hashed_password, salt = self._hash_password(new_password)
-        
-        cursor.execute('''
-        UPDATE users SET password_hash = ?, salt = ? WHERE id = ?
-        ''', (hashed_password, salt, user_id))
-        
-        # Marquer le token comme utilisé
-        cursor.execute('''
-        UPDATE password_resets SET used = 1 WHERE token = ?
-        ''', (token,))
-        
-        conn.commit()
-        conn.close()
-        
-        return True, "Mot de passe réinitialisé avec succès"
-    except Exception as e:
-        return False, str(e)
-
     
-
-    
\ No newline at end of file
+    def reset_password(self, token, new_password):
+        """Réinitialise le mot de passe avec un token valide"""
+        try:
+            conn = connect(self.db_path)
+            cursor = conn.cursor()
+            
+            # Vérifier si le token existe et est valide
+            cursor.execute('''
+            SELECT user_id, expires_at, used FROM password_resets 
+            WHERE token = ?
+            ''', (token,))
+            
+            reset = cursor.fetchone()
+            conn.close()
+            if not reset:
+                return False, "Token invalide"
+            
+            user_id, expires_at, used = reset
+            
+            # Vérifier si le token a déjà été utilisé
+            if used:
+                return False, "Token déjà utilisé"
+            
+            # Vérifier si le token a expiré
+            expires_at = datetime.strptime(expires_at, '%Y-%m-%d %H:%M:%S.%f')
+            if expires_at < datetime.now():
+                return False, "Token expiré"
+            
+            # Hacher le nouveau mot de passe (hors transaction d'écriture)
+            hashed_password, salt = self._hash_password(new_password)
+            
+            def write(cursor):
+                # Marquer le token comme utilisé (un seul processus peut le consommer)
+                cursor.execute('''
+                UPDATE password_resets SET used = 1 WHERE token = ? AND used = 0
+                ''', (token,))
+                if cursor.rowcount == 0:
+                    return False
+                
+                cursor.execute('''
+                UPDATE users SET password_hash = ?, salt = ? WHERE id = ?
+                ''', (hashed_password, salt, user_id))
+                
+                # Révoquer les sessions ouvertes avec l'ancien mot de passe
+                cursor.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+                return True
+            
+            if not run_write(self.db_path, write):
+                return False, "Token déjà utilisé"
+            
+            self.invalidate_user(user_id)
+            
+            return True, "Mot de passe réinitialisé avec succès"
+        except Exception as e:
+            return False, str(e)